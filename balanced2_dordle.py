@@ -6,117 +6,88 @@ import matplotlib.pyplot as plt
 import time
 import numpy as np
 
-# ANSI escape codes for colors
-COLORS = {
-    "green": "\033[92m",   
-    "yellow": "\033[93m", 
-    "gray": "\033[90m",
-    "reset": "\033[0m"    
-}
-
-# helper function to get vectorized feedback
-# [0] indicates "gray letter"
-# [1] indicates "yellow letter"
-# [2] indicates "green letter"
-def get_vector_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(2)
-        elif letter in target:
-            feedback.append(1)
-        else:
-            feedback.append(0)
-    return feedback
-
-
-# helper function to get feedback and format with colors
-def get_colored_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(COLORS["green"] + letter + COLORS["reset"])
-        elif letter in target:
-            feedback.append(COLORS["yellow"] + letter + COLORS["reset"])
-        else:
-            feedback.append(COLORS["gray"] + letter + COLORS["reset"])
-    return ''.join(feedback)
+import profiling
+import verbosity
+from csp_scoring import CSPSolver, max_entropy, pruned_guess, rank_words, score_words, select_guess
+from feedback import encode_feedback, guess_entropies, joint_guess_entropies, load_feedback_table, num_answers
+from solver import play_game
+from state_cache import BOARD_CACHE_BYTES, board_turn, index_width, shared_cache
 
 
 def score_word_list(word_list, guesses, feedback_matrix):
     # print("guesses: ", guesses)
     # print("feedback: ", feedback_matrix)
 
-    # initialize a dictionary to store scores for each word
-    word_scores = {word: 0 for word in word_list}
-
-    # hyper parameters
-    correct_position_match_reward = 10
-    correct_letter_contains_reward = 5
-    incorrect_letter_penalty = -100
-    uncommon_letter_penalty = -0.5
-    
-    # loop through each word in the word list to calculate a score
-    for sample_word in word_list:
-        word_score = 0
-        for guess, feedback in zip(guesses, feedback_matrix):
-            if guess == sample_word:
-                word_score += incorrect_letter_penalty
-            else:
-                for i, (guess_letter, guess_fb) in enumerate(zip(guess, feedback)):   
-                    if guess_fb == 2:  # guess letter is in the correct position of target word
-                        if sample_word[i] == guess_letter:
-                            word_score += correct_position_match_reward  # high score for a correct-position match
-                        else:
-                            word_score += incorrect_letter_penalty  # incorrect word
-                    elif guess_fb == 1:  # guess letter is in the target word but in the wrong position
-                        if guess_letter in sample_word and sample_word[i] != guess_letter:
-                            word_score += correct_letter_contains_reward  # small boost for correct letter, wrong position
-                        else:
-                            word_score += incorrect_letter_penalty # incorrect word
-                    elif guess_fb == 0:  # guess letter is not in the target word
-                        if guess_letter in sample_word:
-                            word_score += incorrect_letter_penalty  # incorrect word
-        
-
-        for uncommon in ['q', 'j', 'z', 'x', 'v', 'k', 'w']:
-            if uncommon in sample_word:
-                word_score += uncommon_letter_penalty # slight penalty if word has uncommon letters in it
-
-        word_scores[sample_word] = word_score  # assign the computed score to the word
+    # score every word at once from the precomputed letter encoding
+    scores = score_words(word_list, guesses, feedback_matrix)
 
     # sort words by score in descending order
-    sorted_words = sorted(word_scores.items(), key=lambda x: x[1], reverse=True)
+    sorted_words = rank_words(word_list, scores)
     return sorted_words 
 
 
-def calc_entropy(guesses, word_score):
+# candidates restricts the partition to the target indices still consistent
+# with the feedback so far; by default every answer in word_score is a target
+def calc_entropy(guesses, word_score, word_list, candidates=None):
     max_entropy = -1
     candidate_list = [word for word, score in word_score]
     
     overall_score = {word: (0,0) for word in candidate_list}
 
-    for guess, score in word_score:
-        if guess in guesses or score <= 0: # filter out all words that do not satisfy constraints
-            continue
-
-        feedback_counts = {}
-        for target in candidate_list:
+    # feedback codes are looked up by word index instead of recomputed
+    word_index, feedback_codes = load_feedback_table(word_list)
+    if candidates is not None:
+        candidate_idx = candidates
+    else:
+        candidate_idx = [word_index[target] for target in candidate_list if word_index[target] < num_answers(word_list)]
 
-            feedback = tuple(get_vector_feedback(guess, target))
-            feedback_counts[feedback] = feedback_counts.get(feedback, 0) + 1
+    # filter out all words that do not satisfy constraints
+    scored = [(guess, score) for guess, score in word_score if guess not in guesses and score > 0]
+    entropies = guess_entropies(feedback_codes, [word_index[guess] for guess, score in scored], candidate_idx)
 
-        total = sum(feedback_counts.values())
-        entropy = 0
-        for count in feedback_counts.values():
-            p = count / total
-            entropy -= p * np.log2(p) if p > 0 else 0
-
-        overall_score[guess] = (score, entropy)
+    for (guess, score), entropy in zip(scored, entropies):
+        overall_score[guess] = (score, float(entropy))
     
     return overall_score
 
 
+# calc_entropy for the left and right boards at once: the entropies of every
+# word scored on either board come from one fused pass over both boards'
+# candidate sets
+def calc_board_entropies(guesses, word_score_left, word_score_right, word_list, candidates_left=None, candidates_right=None):
+    word_index, feedback_codes = load_feedback_table(word_list)
+    answers = num_answers(word_list)
+    if candidates_left is None:
+        candidates_left = [word_index[target] for target, score in word_score_left if word_index[target] < answers]
+    if candidates_right is None:
+        candidates_right = [word_index[target] for target, score in word_score_right if word_index[target] < answers]
+
+    # filter out all words that do not satisfy constraints
+    scored_left = [(guess, score) for guess, score in word_score_left if guess not in guesses and score > 0]
+    scored_right = [(guess, score) for guess, score in word_score_right if guess not in guesses and score > 0]
+    scored = list(dict.fromkeys([guess for guess, score in scored_left + scored_right]))
+    entropies_left, entropies_right, _ = joint_guess_entropies(
+        feedback_codes, [word_index[guess] for guess in scored], candidates_left, candidates_right
+    )
+    entropy_left = dict(zip(scored, entropies_left.tolist()))
+    entropy_right = dict(zip(scored, entropies_right.tolist()))
+
+    overall_score_left = {word: (0,0) for word, score in word_score_left}
+    for guess, score in scored_left:
+        overall_score_left[guess] = (score, entropy_left[guess])
+    overall_score_right = {word: (0,0) for word, score in word_score_right}
+    for guess, score in scored_right:
+        overall_score_right[guess] = (score, entropy_right[guess])
+    return overall_score_left, overall_score_right
+
+
+# element-wise max of the left and right (csp, entropy) ratings, in left order
+def combine_ratings(entropy_score_ratings_left, entropy_score_ratings_right):
+    entropy_score_ratings = {}
+    for word in entropy_score_ratings_left:
+        entropy_score_ratings[word] = max(entropy_score_ratings_left[word], entropy_score_ratings_right[word])
+    return entropy_score_ratings
+
 
 def make_guess(entropy_scores, csp_weight, entropy_weight, attempt):
     best_score = -1
@@ -134,109 +105,150 @@ def make_guess(entropy_scores, csp_weight, entropy_weight, attempt):
     return best_guess
 
 
-def game(target_words, word_list):
-    
-    attempts = 100
-
-    attempt = 1
-    left_word_solved = False
-    right_word_solved = False
-
-    feedback_matrix1 = []
-    feedback_matrix2 = []
-    guesses = []
-    score_ratings = []
-    entropy_score_ratings = []
-    best_guess = None
-
-    # main game loop
-    while attempt <= attempts:
-        # user's word guess
-        print(f"Attempt {attempt}/{attempts} - Enter your guess: ")
-        guess = "tares" if not best_guess else best_guess
-        if len(score_ratings) > 0:
-            print("Guess is: ", guess) 
-        
-        # validate guess
-        if len(guess) != 5 or guess not in word_list:
-            print("Invalid guess. Try again.")
-            continue
-        
-
-        # display feedback for each target word with colored output
-        colored_feedback1 = get_colored_feedback(target_words[0], target_words[0]) if left_word_solved else get_colored_feedback(guess, target_words[0])
-        colored_feedback2 = get_colored_feedback(target_words[1], target_words[1]) if right_word_solved else get_colored_feedback(guess, target_words[1])
-
-        # get vectorized feeback to be supplied to model
-        vector_feedback1 = get_vector_feedback(target_words[0], target_words[0]) if left_word_solved else get_vector_feedback(guess, target_words[0])
-        vector_feedback2 = get_vector_feedback(target_words[1], target_words[1]) if right_word_solved else get_vector_feedback(guess, target_words[1])
-
-        if guess == target_words[0]:
-            left_word_solved = True
-        
-        if guess == target_words[1]:
-            right_word_solved = True
-
-        print(f"{colored_feedback1} | {colored_feedback2} --> vectorized feedback: {vector_feedback1} | {vector_feedback2}")
-
-        # check end game conditions
-        if left_word_solved and right_word_solved:
-            print(f"Congratulations! You guessed both words, in {attempt} attempts!\n")
-            break
-        
-        # kill game if on last attempt
-        if attempt == attempts:
-            print("Game over! Better luck next time.")
-            print(f"The words were: {target_words}\n")
-            break
-
-        guesses.append(guess)
-        feedback_matrix1.append(vector_feedback1)
-        feedback_matrix2.append(vector_feedback2)
-        print("Feedback matrix 1", feedback_matrix1)
-        print("Feedback matrix 2`", feedback_matrix2)
-
-        if not left_word_solved and not right_word_solved: # if both words unsolved, find best guess for both
-            score_ratings_left = score_word_list(word_list, guesses, feedback_matrix1)
-            entropy_score_ratings_left = calc_entropy(guesses, score_ratings_left)
-            
-            score_ratings_right = score_word_list(word_list, guesses, feedback_matrix2)
-            entropy_score_ratings_right = calc_entropy(guesses, score_ratings_right)
-
-            entropy_score_ratings = {}
-            for word in entropy_score_ratings_left:
-                entropy_score_ratings[word] = max(entropy_score_ratings_left[word], entropy_score_ratings_right[word])
-        elif not left_word_solved:
-            score_ratings = score_word_list(word_list, guesses, feedback_matrix1)
-            entropy_score_ratings = calc_entropy(guesses, score_ratings)
+# each board's entropies depend only on that board's (guess, feedback)
+# history (and, without candidate-aware filtering, not even on that), so with
+# board_cache they are kept per board state in a shared cache, filled in
+# lazily and reused by every game that reaches the same board state
+class Balanced2Solver(CSPSolver):
+    def __init__(self, word_list, board_cache=True, **kwargs):
+        self.board_cache = None
+        if board_cache:
+            namespace = "balanced2-boards-candidates" if kwargs.get("candidate_aware") else "balanced2-boards"
+            self.board_cache = shared_cache(namespace, word_list, BOARD_CACHE_BYTES)
+        self.index_width = index_width(word_list)
+        super().__init__(word_list, **kwargs)
+
+    def reset(self):
+        super().reset()
+        self.board_histories = [bytearray(), bytearray()]
+        self.entropy_vectors = {}
+
+    def observe(self, guess, feedback_left, feedback_right):
+        super().observe(guess, feedback_left, feedback_right)
+        word_index, _ = load_feedback_table(self.word_list)
+        for side, feedback in enumerate((feedback_left, feedback_right)):
+            self.board_histories[side] += board_turn(word_index[guess], encode_feedback(feedback), self.index_width)
+
+    # entropy vectors are keyed by board history, so every branch can share them
+    def shared_state(self):
+        return super().shared_state() + [self.board_cache, self.entropy_vectors]
+
+    def board_candidates(self, side):
+        candidates = self.candidates_left if side == 0 else self.candidates_right
+        return np.arange(num_answers(self.word_list)) if candidates is None else candidates
+
+    # entropy of every word against one board's candidates (NaN until
+    # computed); every board shares one vector without candidate-aware filtering
+    def entropy_vector(self, side):
+        key = bytes(self.board_histories[side]) if self.candidate_aware else b""
+        cache = self.board_cache
+        vector = cache.get(key) if cache is not None else self.entropy_vectors.get(key)
+        if vector is None:
+            vector = np.full(len(self.word_list), np.nan)
+            if cache is not None:
+                cache.put(key, vector, vector.nbytes)
+            else:
+                self.entropy_vectors[key] = vector
+        return vector
+
+    # entropies of guess_idx against the candidates of each board in sides,
+    # computing only the ones not known yet (both boards in one fused pass)
+    def board_entropies(self, guess_idx, sides=(0, 1)):
+        _, feedback_codes = load_feedback_table(self.word_list)
+        vectors = [self.entropy_vector(side) for side in sides]
+        missing = [guess_idx[np.isnan(vector[guess_idx])] for vector in vectors]
+        if len(sides) == 2 and vectors[0] is not vectors[1] and len(missing[0]) and len(missing[1]):
+            both = np.union1d(missing[0], missing[1])
+            vectors[0][both], vectors[1][both], _ = joint_guess_entropies(
+                feedback_codes, both, self.board_candidates(0), self.board_candidates(1)
+            )
+        else:
+            for side, vector in zip(sides, vectors):
+                needed = guess_idx[np.isnan(vector[guess_idx])]
+                if len(needed):
+                    vector[needed] = guess_entropies(feedback_codes, needed, self.board_candidates(side))
+        return [vector[guess_idx] for vector in vectors]
+
+    # make_guess over combine_ratings of both boards' calc_entropy ratings,
+    # computed with pruned_guess: a word's combined rating is the board
+    # rating with the higher CSP value, or the higher entropy on a tie
+    def select_joint_guess(self):
+        word_index, _ = load_feedback_table(self.word_list)
+        guessed = np.zeros(len(self.word_list), dtype=bool)
+        guessed[[word_index[guess] for guess in self.guesses]] = True
+        scores_left, scores_right = self.scorer_left.scores, self.scorer_right.scores
+        scored_left = (scores_left > 0) & ~guessed
+        scored_right = (scores_right > 0) & ~guessed
+        csp_left = np.where(scored_left, scores_left, 0)
+        csp_right = np.where(scored_right, scores_right, 0)
+
+        def entropies(positions):
+            words = order[positions]
+            entropy_left, entropy_right = self.board_entropies(words)
+            return np.where(
+                csp_left[words] > csp_right[words], entropy_left,
+                np.where(csp_right[words] > csp_left[words], entropy_right, np.maximum(entropy_left, entropy_right)),
+            ).tolist()
+
+        # combined ratings are in left rating order
+        order = np.argsort(-scores_left, kind="stable")
+        bound = max(max_entropy(len(self.board_candidates(0))), max_entropy(len(self.board_candidates(1))))
+        position = pruned_guess(
+            np.maximum(csp_left, csp_right)[order], (scored_left | scored_right)[order], entropies,
+            bound, self.csp_weight, self.entropy_weight,
+        )
+        return None if position is None else self.word_list[order[position]]
+
+    def choose_guess(self):
+        # without the ratings printout, entropies are only computed for words
+        # that can still beat the best guess
+        if not verbosity.VERBOSE:
+            if not self.left_word_solved and not self.right_word_solved:
+                return self.select_joint_guess()
+            side = 0 if not self.left_word_solved else 1
+            scorer = self.scorer_left if side == 0 else self.scorer_right
+            return select_guess(
+                self.guesses, scorer.scores, self.word_list, self.board_candidates(side),
+                self.csp_weight, self.entropy_weight, lambda guess_idx: self.board_entropies(guess_idx, (side,))[0],
+            )
+
+        print("Feedback matrix 1", self.feedback_matrix1)
+        print("Feedback matrix 2`", self.feedback_matrix2)
+
+        if not self.left_word_solved and not self.right_word_solved: # if both words unsolved, find best guess for both
+            entropy_score_ratings_left, entropy_score_ratings_right = calc_board_entropies(
+                self.guesses, self.scorer_left.ranked(), self.scorer_right.ranked(), self.word_list,
+                self.candidates_left, self.candidates_right,
+            )
+            entropy_score_ratings = combine_ratings(entropy_score_ratings_left, entropy_score_ratings_right)
+        elif not self.left_word_solved:
+            score_ratings = self.scorer_left.ranked()
+            entropy_score_ratings = calc_entropy(self.guesses, score_ratings, self.word_list, self.candidates_left)
             print("finding words for left...")
         else:
-            score_ratings = score_word_list(word_list, guesses, feedback_matrix2)
-            entropy_score_ratings = calc_entropy(guesses, score_ratings)
+            score_ratings = self.scorer_right.ranked()
+            entropy_score_ratings = calc_entropy(self.guesses, score_ratings, self.word_list, self.candidates_right)
             print("finding words for right...")
 
+        self.print_ratings(entropy_score_ratings)
 
-        print("Scored words (best guesses at the top):")
-        for word, (csp_score, entropy) in entropy_score_ratings.items():
-            if csp_score <= 0:
-                break
-            print(f"{word}: {csp_score}, {entropy}")
-        
-        
-        csp_weight = 1
-        entropy_weight = 1
-        
-        best_guess = make_guess(entropy_score_ratings, csp_weight, entropy_weight, attempt)
-        print("BEST GUESS: ", best_guess)  
+        best_guess = make_guess(entropy_score_ratings, self.csp_weight, self.entropy_weight, len(self.guesses))
+        print("BEST GUESS: ", best_guess)
+        return best_guess
 
+    # the guess is only announced once a board is solved, as in the original
+    # script (its single-board ratings were the ones that enabled the line)
+    def print_guess(self, attempt, attempts, guess):
+        print(f"Attempt {attempt}/{attempts} - Enter your guess: ")
+        if self.left_word_solved or self.right_word_solved:
+            print("Guess is: ", guess)
 
-        # INITIAL TESTING: (on 1000 attempts)
-        # When using csp_weight = 1 and entropy_weight = 0 (not using entropy at all), avg_attempts = 6.359
-        # When using csp_weight = 1 and entropy_weight = 1 (equal weightage), avg_attempts = 6.227
-
-        attempt += 1
 
-    return attempt
+# opening_book is an optional table of precomputed second guesses
+# (opening_book.load_opening_book) built for the same solver settings
+def game(target_words, word_list, candidate_aware=False, opening_book=None, board_cache=True):
+    solver = Balanced2Solver(word_list, board_cache=board_cache, candidate_aware=candidate_aware, opening_book=opening_book)
+    return play_game(solver, target_words)
 
 
 def preprocess_data(filename):
@@ -245,6 +257,7 @@ def preprocess_data(filename):
     return word_list
 
 def main():
+    profiling.enable_from_env()
 
     total_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1
 
@@ -260,14 +273,16 @@ def main():
     start = time.time()
     while game_num <= total_games:
         target_words = random.sample(word_list, 2)  # select two target words
-        print("target words: ", target_words)
-        print("*** WELCOME TO A NEW GAME OF DORDLE ***")
+        if verbosity.VERBOSE:
+            print("target words: ", target_words)
+            print("*** WELCOME TO A NEW GAME OF DORDLE ***")
         game_attempts = game(target_words, word_list)
         num_attempts += game_attempts
         game_num += 1
 
         attempt_dict[game_attempts] = attempt_dict.get(game_attempts, 0) + 1
     end = time.time()
+    profiling.finish()
 
     print("total games", total_games)
     average = float(num_attempts / total_games)
@@ -4,120 +4,51 @@ import random
 import sys
 import matplotlib.pyplot as plt
 import time
-import numpy as np
-
-# ANSI escape codes for colors
-COLORS = {
-    "green": "\033[92m",   
-    "yellow": "\033[93m", 
-    "gray": "\033[90m",
-    "reset": "\033[0m"    
-}
-
-# helper function to get vectorized feedback
-# [0] indicates "gray letter"
-# [1] indicates "yellow letter"
-# [2] indicates "green letter"
-def get_vector_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(2)
-        elif letter in target:
-            feedback.append(1)
-        else:
-            feedback.append(0)
-    return feedback
-
-
-# helper function to get feedback and format with colors
-def get_colored_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(COLORS["green"] + letter + COLORS["reset"])
-        elif letter in target:
-            feedback.append(COLORS["yellow"] + letter + COLORS["reset"])
-        else:
-            feedback.append(COLORS["gray"] + letter + COLORS["reset"])
-    return ''.join(feedback)
+
+import profiling
+import verbosity
+from csp_scoring import CSPSolver, rank_words, score_words, select_guess
+from feedback import guess_entropies, load_feedback_table, num_answers
+from solver import play_game
 
 
 def score_word_list(word_list, guesses, feedback_matrix):
     # print("guesses: ", guesses)
     # print("feedback: ", feedback_matrix)
 
-    # initialize a dictionary to store scores for each word
-    word_scores = {word: 0 for word in word_list}
-
-    # hyper parameters
-    correct_position_match_reward = 10
-    correct_letter_contains_reward = 5
-    incorrect_letter_penalty = -100
-    uncommon_letter_penalty = -0.5
-    
-    # loop through each word in the word list to calculate a score
-    for sample_word in word_list:
-        word_score = 0
-        for guess, feedback in zip(guesses, feedback_matrix):
-            if guess == sample_word:
-                word_score += incorrect_letter_penalty
-            else:
-                for i, (guess_letter, guess_fb) in enumerate(zip(guess, feedback)):   
-                    if guess_fb == 2:  # guess letter is in the correct position of target word
-                        if sample_word[i] == guess_letter:
-                            word_score += correct_position_match_reward  # high score for a correct-position match
-                        else:
-                            word_score += incorrect_letter_penalty  # incorrect word
-                    elif guess_fb == 1:  # guess letter is in the target word but in the wrong position
-                        if guess_letter in sample_word and sample_word[i] != guess_letter:
-                            word_score += correct_letter_contains_reward  # small boost for correct letter, wrong position
-                        else:
-                            word_score += incorrect_letter_penalty # incorrect word
-                    elif guess_fb == 0:  # guess letter is not in the target word
-                        if guess_letter in sample_word:
-                            word_score += incorrect_letter_penalty  # incorrect word
-        
-
-        for uncommon in ['q', 'j', 'z', 'x', 'v', 'k', 'w']:
-            if uncommon in sample_word:
-                word_score += uncommon_letter_penalty # slight penalty if word has uncommon letters in it
-
-        word_scores[sample_word] = word_score  # assign the computed score to the word
+    # score every word at once from the precomputed letter encoding
+    scores = score_words(word_list, guesses, feedback_matrix)
 
     # sort words by score in descending order
-    sorted_words = sorted(word_scores.items(), key=lambda x: x[1], reverse=True)
+    sorted_words = rank_words(word_list, scores)
     return sorted_words 
 
 
-def calc_entropy(guesses, word_score):
+# candidates restricts the partition to the target indices still consistent
+# with the feedback so far; by default every answer in word_score is a target
+def calc_entropy(guesses, word_score, word_list, candidates=None):
     max_entropy = -1
     candidate_list = [word for word, score in word_score]
     
     overall_score = {word: (0,0) for word in candidate_list}
 
-    for guess, score in word_score:
-        if guess in guesses or score <= 0: # filter out all words that do not satisfy constraints
-            continue
+    # feedback codes are looked up by word index instead of recomputed
+    word_index, feedback_codes = load_feedback_table(word_list)
+    if candidates is not None:
+        candidate_idx = candidates
+    else:
+        candidate_idx = [word_index[target] for target in candidate_list if word_index[target] < num_answers(word_list)]
 
-        feedback_counts = {}
-        for target in candidate_list:
+    # filter out all words that do not satisfy constraints
+    scored = [(guess, score) for guess, score in word_score if guess not in guesses and score > 0]
+    entropies = guess_entropies(feedback_codes, [word_index[guess] for guess, score in scored], candidate_idx)
 
-            feedback = tuple(get_vector_feedback(guess, target))
-            feedback_counts[feedback] = feedback_counts.get(feedback, 0) + 1
-
-        total = sum(feedback_counts.values())
-        entropy = 0
-        for count in feedback_counts.values():
-            p = count / total
-            entropy -= p * np.log2(p) if p > 0 else 0
-
-        overall_score[guess] = (score, entropy)
+    for (guess, score), entropy in zip(scored, entropies):
+        overall_score[guess] = (score, float(entropy))
     
     return overall_score
 
 
-
 def make_guess(entropy_scores, csp_weight, entropy_weight, attempt):
     best_score = -1
     best_guess = None
@@ -134,122 +65,52 @@ def make_guess(entropy_scores, csp_weight, entropy_weight, attempt):
     return best_guess
 
 
-def game(target_words, word_list):
-    
-    attempts = 100
-
-    attempt = 1
-    left_word_solved = False
-    right_word_solved = False
-
-    feedback_matrix1 = []
-    feedback_matrix2 = []
-    guesses = []
-    score_ratings = []
-    entropy_score_ratings = []
-    best_guess = None
+class Balanced1Solver(CSPSolver):
+    def choose_guess(self):
+        if verbosity.VERBOSE:
+            print("Feedback matrix 1", self.feedback_matrix1)
+            print("Feedback matrix 2`", self.feedback_matrix2)
 
-    # main game loop
-    while attempt <= attempts:
-        # user's word guess
-        print(f"Attempt {attempt}/{attempts} - Enter your guess: ")
-        guess = "tares" if not best_guess else best_guess
-        if len(score_ratings) > 0:
-            print("Guess is: ", guess) 
-        
-        # validate guess
-        if len(guess) != 5 or guess not in word_list:
-            print("Invalid guess. Try again.")
-            continue
-        
-
-        # display feedback for each target word with colored output
-        colored_feedback1 = get_colored_feedback(target_words[0], target_words[0]) if left_word_solved else get_colored_feedback(guess, target_words[0])
-        colored_feedback2 = get_colored_feedback(target_words[1], target_words[1]) if right_word_solved else get_colored_feedback(guess, target_words[1])
-
-        # get vectorized feeback to be supplied to model
-        vector_feedback1 = get_vector_feedback(target_words[0], target_words[0]) if left_word_solved else get_vector_feedback(guess, target_words[0])
-        vector_feedback2 = get_vector_feedback(target_words[1], target_words[1]) if right_word_solved else get_vector_feedback(guess, target_words[1])
-
-        if guess == target_words[0]:
-            left_word_solved = True
-        
-        if guess == target_words[1]:
-            right_word_solved = True
-
-        print(f"{colored_feedback1} | {colored_feedback2} --> vectorized feedback: {vector_feedback1} | {vector_feedback2}")
-
-        # check end game conditions
-        if left_word_solved and right_word_solved:
-            print(f"Congratulations! You guessed both words, in {attempt} attempts!\n")
-            break
-        
-        # kill game if on last attempt
-        if attempt == attempts:
-            print("Game over! Better luck next time.")
-            print(f"The words were: {target_words}\n")
-            break
-
-        guesses.append(guess)
-        feedback_matrix1.append(vector_feedback1)
-        feedback_matrix2.append(vector_feedback2)
-        print("Feedback matrix 1", feedback_matrix1)
-        print("Feedback matrix 2`", feedback_matrix2)
-
-        if not left_word_solved and not right_word_solved: # if both words unsolved, prioritize less solved one
+        if not self.left_word_solved and not self.right_word_solved: # if both words unsolved, prioritize less solved one
             left_word_knowledge = [0, 0, 0, 0, 0]
-            for row in feedback_matrix1:
+            for row in self.feedback_matrix1:
                 for i, val in enumerate(row):
                     left_word_knowledge[i] = max(left_word_knowledge[i], val)
 
             right_word_knowledge = [0, 0, 0, 0, 0]
-            for row in feedback_matrix2:
+            for row in self.feedback_matrix2:
                 for i, val in enumerate(row):
                     right_word_knowledge[i] = max(right_word_knowledge[i], val)
             
             prioritize_left = False
             if sum(left_word_knowledge) < sum(right_word_knowledge):
                 prioritize_left = True
-
-            if prioritize_left:
-                score_ratings = score_word_list(word_list, guesses, feedback_matrix1)
-                entropy_score_ratings = calc_entropy(guesses, score_ratings)
-                print("finding words for left...")
-            else:
-                score_ratings = score_word_list(word_list, guesses, feedback_matrix2)
-                entropy_score_ratings = calc_entropy(guesses, score_ratings)
-                print("finding words for right...")
-        elif not left_word_solved:
-            score_ratings = score_word_list(word_list, guesses, feedback_matrix1)
-            entropy_score_ratings = calc_entropy(guesses, score_ratings)
-            print("finding words for left...")
         else:
-            score_ratings = score_word_list(word_list, guesses, feedback_matrix2)
-            entropy_score_ratings = calc_entropy(guesses, score_ratings)
-            print("finding words for right...")
+            prioritize_left = not self.left_word_solved
 
+        if prioritize_left:
+            scorer, candidates = self.scorer_left, self.candidates_left
+        else:
+            scorer, candidates = self.scorer_right, self.candidates_right
 
-        print("Scored words (best guesses at the top):")
-        for word, (csp_score, entropy) in entropy_score_ratings.items():
-            if csp_score <= 0:
-                break
-            print(f"{word}: {csp_score}, {entropy}")
-        
-        
-        csp_weight = 1
-        entropy_weight = 1
-        
-        best_guess = make_guess(entropy_score_ratings, csp_weight, entropy_weight, attempt)
-        print("BEST GUESS: ", best_guess)  
+        # without the ratings printout, entropies are only computed for words
+        # that can still beat the best guess
+        if not verbosity.VERBOSE:
+            return select_guess(self.guesses, scorer.scores, self.word_list, candidates, self.csp_weight, self.entropy_weight)
 
+        entropy_score_ratings = calc_entropy(self.guesses, scorer.ranked(), self.word_list, candidates)
+        print("finding words for left..." if prioritize_left else "finding words for right...")
+        self.print_ratings(entropy_score_ratings)
 
-        # INITIAL TESTING: (on 1000 attempts)
-        # When using csp_weight = 1 and entropy_weight = 0 (not using entropy at all), avg_attempts = 6.359
-        # When using csp_weight = 1 and entropy_weight = 1 (equal weightage), avg_attempts = 6.227
+        best_guess = make_guess(entropy_score_ratings, self.csp_weight, self.entropy_weight, len(self.guesses))
+        print("BEST GUESS: ", best_guess)
+        return best_guess
 
-        attempt += 1
 
-    return attempt
+# opening_book is an optional table of precomputed second guesses
+# (opening_book.load_opening_book) built for the same solver settings
+def game(target_words, word_list, candidate_aware=False, opening_book=None):
+    return play_game(Balanced1Solver(word_list, candidate_aware=candidate_aware, opening_book=opening_book), target_words)
 
 
 def preprocess_data(filename):
@@ -258,6 +119,7 @@ def preprocess_data(filename):
     return word_list
 
 def main():
+    profiling.enable_from_env()
 
     total_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1
 
@@ -273,14 +135,16 @@ def main():
     start = time.time()
     while game_num <= total_games:
         target_words = random.sample(word_list, 2)  # select two target words
-        print("target words: ", target_words)
-        print("*** WELCOME TO A NEW GAME OF DORDLE ***")
+        if verbosity.VERBOSE:
+            print("target words: ", target_words)
+            print("*** WELCOME TO A NEW GAME OF DORDLE ***")
         game_attempts = game(target_words, word_list)
         num_attempts += game_attempts
         game_num += 1
 
         attempt_dict[game_attempts] = attempt_dict.get(game_attempts, 0) + 1
     end = time.time()
+    profiling.finish()
 
     print("total games", total_games)
     average = float(num_attempts / total_games)
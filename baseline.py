@@ -4,41 +4,10 @@ import random
 import sys
 import time
 
-# ANSI escape codes for colors
-COLORS = {
-    "green": "\033[92m",   
-    "yellow": "\033[93m", 
-    "gray": "\033[90m",
-    "reset": "\033[0m"    
-}
-
-# helper function to get vectorized feedback
-# [0] indicates "gray letter"
-# [1] indicates "yellow letter"
-# [2] indicates "green letter"
-def get_vector_feeback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(2)
-        elif letter in target:
-            feedback.append(1)
-        else:
-            feedback.append(0)
-    return feedback
-
-
-# helper function to get feedback and format with colors
-def get_colored_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(COLORS["green"] + letter + COLORS["reset"])
-        elif letter in target:
-            feedback.append(COLORS["yellow"] + letter + COLORS["reset"])
-        else:
-            feedback.append(COLORS["gray"] + letter + COLORS["reset"])
-    return ''.join(feedback)
+import profiling
+import verbosity
+from feedback import answer_words
+from solver import Solver, play_game
 
 
 def check_word_against_knowledge(word, knowledge):
@@ -48,7 +17,8 @@ def check_word_against_knowledge(word, knowledge):
     return True
 
 def guess_word(possible_words, knowledge):
-    print(knowledge)
+    if verbosity.VERBOSE:
+        print(knowledge)
     updated_possibilities = []
     for word in possible_words:
         if check_word_against_knowledge(word, knowledge):
@@ -65,78 +35,44 @@ def update_knowledge(knowledge, vector_feedback1, guess):
             knowledge[index] = [guess[index]]
     return knowledge
 
-def game(target_words, word_list):
-    
-    attempts = 100
-
-    attempt = 1
-    left_word_solved = False
-    right_word_solved = False
-
-    possible_words_left = list(word_list)
-    possible_words_right = list(word_list)
-    vector_feedback1 = None
-    vector_feedback2 = None
-    knowledge_left = {} # mapping from position to possibilities
-    knowledge_right = {}
-
-    letters = 'abcdefghijklmnopqrstuvwxyz'
-    for i in range(5):
-        knowledge_left[i] = []
-        knowledge_right[i] = []
-        for letter in letters:
-            knowledge_left[i].append(letter)
-            knowledge_right[i].append(letter)
-
-    # main game loop
-    while attempt <= attempts:
-
-        # guess = input(f"Attempt {attempt}/{attempts} - Enter your guess: ").lower() # user's word guess
-        if not left_word_solved:
-            guess = guess_word(possible_words_left, knowledge_left)
-        else:
-            guess = guess_word(possible_words_right, knowledge_right)
-        print("Guessing:", guess)
-        
-        # validate guess
-        if len(guess) != 5 or guess not in word_list:
-            print("Invalid guess. Try again.")
-            continue
+class BaselineSolver(Solver):
+    def reset(self):
+        self.left_word_solved = False
+        self.possible_words_left = answer_words(self.word_list)
+        self.possible_words_right = answer_words(self.word_list)
+        self.knowledge_left = {} # mapping from position to possibilities
+        self.knowledge_right = {}
+
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        for i in range(5):
+            self.knowledge_left[i] = list(letters)
+            self.knowledge_right[i] = list(letters)
 
-        # display feedback for each target word with colored output
-        colored_feedback1 = get_colored_feedback(target_words[0], target_words[0]) if left_word_solved else get_colored_feedback(guess, target_words[0])
-        colored_feedback2 = get_colored_feedback(target_words[1], target_words[1]) if right_word_solved else get_colored_feedback(guess, target_words[1])
+    def suggest(self):
+        if not self.left_word_solved:
+            return guess_word(self.possible_words_left, self.knowledge_left)
+        return guess_word(self.possible_words_right, self.knowledge_right)
 
-        # get vectorized feeback to be supplied to model
-        vector_feedback1 = get_vector_feeback(target_words[0], target_words[0]) if left_word_solved else get_vector_feeback(guess, target_words[0])
-        vector_feedback2 = get_vector_feeback(target_words[1], target_words[1]) if right_word_solved else get_vector_feeback(guess, target_words[1])
+    def observe(self, guess, feedback_left, feedback_right):
+        self.knowledge_left = update_knowledge(self.knowledge_left, feedback_left, guess)
+        self.knowledge_right = update_knowledge(self.knowledge_right, feedback_right, guess)
 
-        knowledge_left = update_knowledge(knowledge_left, vector_feedback1, guess)
-        knowledge_right = update_knowledge(knowledge_right, vector_feedback2, guess)
+        if feedback_left.count(2) == 5:
+            self.left_word_solved = True
 
-        if guess == target_words[0]:
-            left_word_solved = True
-        
-        if guess == target_words[1]:
-            right_word_solved = True
+    def print_guess(self, attempt, attempts, guess):
+        print("Guessing:", guess)
 
-        print(f"{colored_feedback1} | {colored_feedback2} --> vectorized feedback: {vector_feedback1} | {vector_feedback2}")
-        # print(f"{colored_feedback1} --> vectorized feedback: {vector_feedback1}")
+    def print_won(self, attempt):
+        print(f"Congratulations! You guessed the word, in {attempt} attempts!\n")
 
-        # check end game conditions
-        if left_word_solved and right_word_solved:
-            print(f"Congratulations! You guessed the word, in {attempt} attempts!\n")
-            break
-        
-        # kill game if on last attempt
-        if attempt == attempts:
-            print("Game over! Better luck next time.")
-            print(f"The word was: {target_words}\n")
-            break
+    def print_lost(self, target_words):
+        print("Game over! Better luck next time.")
+        print(f"The word was: {target_words}\n")
 
-        attempt += 1
 
-    return attempt
+def game(target_words, word_list):
+    return play_game(BaselineSolver(word_list), target_words)
 
 
 def preprocess_data(filename):
@@ -145,6 +81,7 @@ def preprocess_data(filename):
     return word_list
 
 def main():
+    profiling.enable_from_env()
 
     total_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
 
@@ -160,8 +97,9 @@ def main():
     start = time.time()
     while game_num <= total_games:
         target_words = random.sample(word_list, 2)  # select two target words
-        print("target word: ", target_words)
-        print("*** WELCOME TO A NEW GAME OF DORDLE ***")
+        if verbosity.VERBOSE:
+            print("target word: ", target_words)
+            print("*** WELCOME TO A NEW GAME OF DORDLE ***")
         game_result = game(target_words, word_list)
         num_attempts += game_result
         game_num += 1
@@ -171,6 +109,7 @@ def main():
         else:
             guess_distribution[game_result] = 1
     end = time.time()
+    profiling.finish()
     
     print("total games", total_games)
     average = float(num_attempts / total_games)
@@ -0,0 +1,218 @@
+"""Lockstep batch engine that plays a whole population of games as array operations.
+
+Usage: python batch_engine.py [--games N] [--seed S] [--all-pairs]
+                               [--chunk-size C] [--processes P] [--answers FILE]
+
+Every game in the batch advances one turn at a time. A board's state is its
+(guess, feedback code) history, so games whose active boards share a history
+share one guess decision, and feedback lookup, solved flags and attempt
+counters are updated for all games at once. Only the deterministic
+dordle_entropy strategy is implemented; its results match
+dordle_entropy.game for the same targets.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from feedback import (
+    NUM_CODES, SOLVED_CODE, SharedDictionary, decode_feedback, dictionary_pool, guess_entropies, load_feedback_table,
+    load_word_lists, num_answers,
+)
+from simulate import game_targets, summarize
+
+# number of green positions in each feedback code
+GREENS = np.array([decode_feedback(code).count(2) for code in range(NUM_CODES)])
+
+
+# single-board state shared by every game whose board has the same history of
+# (guess index, feedback code) pairs: the targets still consistent with it
+# (ascending word indices) and whether some feedback had exactly four greens
+class BoardNode:
+    __slots__ = ("history", "candidates", "word_4_correct")
+
+    def __init__(self, history, candidates, word_4_correct):
+        self.history = history
+        self.candidates = candidates
+        self.word_4_correct = word_4_correct
+
+
+# dordle_entropy.make_guess for one board node; returns the guess index and
+# the updated wrong guess flag
+def entropy_decision(node, wrong_guess_made, feedback_codes):
+    candidate_idx = node.candidates
+    guess_idx = candidate_idx
+
+    # If the agent satisfies the wrong guess condition
+    if not wrong_guess_made and node.word_4_correct and len(candidate_idx) >= 3:
+        unguessed = np.ones(len(feedback_codes), dtype=bool)
+        unguessed[[guess for guess, _ in node.history]] = False
+        guess_idx = np.flatnonzero(unguessed)
+        wrong_guess_made = True
+    elif len(candidate_idx) <= 2:
+        # one or two candidates split into singletons whichever is guessed,
+        # so the first one wins the tie
+        guess_idx = candidate_idx[:1]
+
+    if len(guess_idx) == 0:
+        raise ValueError(f"no guess left for board history {node.history}")
+    if len(guess_idx) == 1:
+        return int(guess_idx[0]), wrong_guess_made
+    entropies = guess_entropies(feedback_codes, guess_idx, candidate_idx)
+    return int(guess_idx[int(np.argmax(entropies))]), wrong_guess_made
+
+
+# children of the nodes in parents after guesses, one per distinct key;
+# keys are (parent * num_words + guess) * 243 + code in ascending order
+def expand_nodes(parents, keys, num_words, feedback_codes):
+    children = []
+    group_keys = keys // NUM_CODES
+    starts = np.flatnonzero(np.r_[True, group_keys[1:] != group_keys[:-1]])
+    stops = np.r_[starts[1:], len(keys)]
+    for start, stop in zip(starts, stops):
+        parent = parents[int(group_keys[start] // num_words)]
+        guess = int(group_keys[start] % num_words)
+
+        # split the parent's candidates by their feedback for guess, keeping
+        # each group in ascending word order
+        codes = feedback_codes[guess][parent.candidates]
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        for code in (keys[start:stop] % NUM_CODES).tolist():
+            lo, hi = np.searchsorted(sorted_codes, [code, code + 1])
+            children.append(BoardNode(
+                parent.history + ((guess, code),),
+                parent.candidates[np.sort(order[lo:hi])],
+                parent.word_4_correct or GREENS[code] == 4,
+            ))
+    return children
+
+
+# play every game in targets (an array of (left, right) word index pairs) in
+# lockstep and return the attempts per game (attempts if unfinished).
+# decisions memoizes guesses by (board history, wrong guess flag) and may be
+# shared between calls on the same word list.
+def play_batch(word_list, targets, attempts=100, decisions=None):
+    _, feedback_codes = load_feedback_table(word_list)
+    num_words = len(word_list)
+    targets = np.asarray(targets, dtype=np.intp)
+    decisions = {} if decisions is None else decisions
+
+    nodes = [BoardNode((), np.arange(num_answers(word_list)), False)]
+    node_of = np.zeros(targets.shape, dtype=np.intp)
+    wrong_guess_made = np.zeros(targets.shape, dtype=bool)
+    solved = np.zeros(targets.shape, dtype=bool)
+    result = np.full(len(targets), attempts)
+    live = np.arange(len(targets))
+
+    for attempt in range(1, attempts + 1):
+        # priority to left word, then the right word once the left is solved
+        side = solved[live, 0].astype(np.intp)
+        keys = node_of[live, side] * 2 + wrong_guess_made[live, side]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        choices = []
+        for key in unique_keys.tolist():
+            node, wrong = nodes[key // 2], bool(key % 2)
+            memo_key = (node.history, wrong)
+            if memo_key not in decisions:
+                decisions[memo_key] = entropy_decision(node, wrong, feedback_codes)
+            choices.append(decisions[memo_key])
+        guesses = np.array([guess for guess, _ in choices], dtype=np.intp)[inverse]
+        wrong_guess_made[live, side] = np.array([wrong for _, wrong in choices], dtype=bool)[inverse]
+
+        # feedback for both boards of every game, then retire finished games
+        codes = feedback_codes[guesses[:, None], targets[live]].astype(np.intp)
+        solved[live] |= codes == SOLVED_CODE
+        done = solved[live].all(axis=1)
+        result[live[done]] = attempt
+        live, guesses, codes = live[~done], guesses[~done], codes[~done]
+        if len(live) == 0:
+            break
+
+        # move every unsolved board to the node for its new history
+        rows, boards = np.nonzero(~solved[live])
+        keys = (node_of[live[rows], boards] * num_words + guesses[rows]) * NUM_CODES + codes[rows, boards]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        nodes = expand_nodes(nodes, unique_keys, num_words, feedback_codes)
+        node_of[live[rows], boards] = inverse
+
+    return result
+
+
+# guesses memoized by the chunks played in this process
+_decisions = {}
+
+
+# play one chunk of games; decisions deeper than the second guess are
+# rarely shared between chunks, so only the first two turns are kept
+def play_chunk(word_list, targets):
+    result = play_batch(word_list, targets, decisions=_decisions)
+    for key in [key for key in _decisions if len(key[0]) > 1]:
+        del _decisions[key]
+    return result
+
+
+def _play_chunk(args):
+    return play_chunk(*args)
+
+
+# every unordered pair of distinct answers (left index < right index), in
+# chunks of about chunk_size games
+def all_pairs(num_words, chunk_size):
+    chunk = []
+    size = 0
+    for left in range(num_words - 1):
+        rights = np.arange(left + 1, num_words)
+        chunk.append(np.column_stack([np.full(len(rights), left), rights]))
+        size += len(rights)
+        if size >= chunk_size:
+            yield np.concatenate(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield np.concatenate(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Dordle games in lockstep batches (entropy strategy).")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--all-pairs", action="store_true", help="play every unordered pair of answers")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", default=None, help="file of possible targets (default: every word)")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words, args.answers)
+    word_index, _ = load_feedback_table(word_list)
+    if args.all_pairs:
+        chunks = all_pairs(num_answers(word_list), args.chunk_size)
+    else:
+        # the same seeded games as simulate.py
+        targets = [[word_index[word] for word in game_targets(word_list, args.seed, game_num)]
+                   for game_num in range(1, args.games + 1)]
+        chunks = (targets[i:i + args.chunk_size] for i in range(0, len(targets), args.chunk_size))
+
+    start = time.perf_counter()
+    results = []
+    processes = args.processes or os.cpu_count() or 1
+    if processes == 1:
+        for chunk in chunks:
+            results.extend((None, None, int(attempts), 0.0) for attempts in play_chunk(word_list, chunk))
+    else:
+        with SharedDictionary(word_list) as shared, dictionary_pool(processes, shared) as pool:
+            for chunk_attempts in pool.imap_unordered(_play_chunk, ((word_list, chunk) for chunk in chunks)):
+                results.extend((None, None, int(attempts), 0.0) for attempts in chunk_attempts)
+    summary = summarize(results, time.perf_counter() - start)
+
+    print("total games", summary["total_games"])
+    print(f"average attemps per game: {summary['average']}")
+    print(f"guess distribution: {summary['guess_distribution']}")
+    print("total time: ", summary["wall_time"], "seconds")
+
+
+if __name__ == "__main__":
+    main()
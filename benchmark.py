@@ -0,0 +1,78 @@
+"""Common-random-numbers benchmark: every strategy plays the same seeded target pairs.
+
+Usage: python benchmark.py [--strategies S ...] [--games N] [--seed S]
+                           [--processes P] [--output FILE] [--reference S]
+
+Per-game results are written as JSON lines (one record per strategy and game)
+and each strategy is compared to the reference strategy game by game, which
+gives much tighter confidence intervals than comparing independent runs.
+"""
+
+import argparse
+import json
+import math
+
+from feedback import load_word_lists
+from simulate import run_simulation
+from solver import STRATEGIES
+
+
+# mean of b - a over paired games with a normal-approximation 95% interval
+def paired_difference(attempts_a, attempts_b):
+    diffs = [b - a for a, b in zip(attempts_a, attempts_b)]
+    n = len(diffs)
+    mean = sum(diffs) / n
+    if n < 2:
+        return mean, float("nan")
+    variance = sum((d - mean) ** 2 for d in diffs) / (n - 1)
+    return mean, 1.96 * math.sqrt(variance / n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strategies on the same seeded games.")
+    parser.add_argument("--strategies", nargs="+", default=sorted(STRATEGIES), choices=sorted(STRATEGIES))
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--output", default="results.jsonl")
+    parser.add_argument("--reference", default=None, help="strategy the others are compared to")
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", default=None, help="file of possible targets (default: every word)")
+    parser.add_argument("--opening-book", action="store_true", help="use the prebuilt second-guess tables")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words, args.answers)
+    attempts = {}
+    summaries = {}
+    with open(args.output, "w") as file:
+        for strategy in args.strategies:
+            results, summary = run_simulation(
+                strategy, word_list, args.games, args.seed, args.processes, opening_book=args.opening_book
+            )
+            for game_num, target_words, game_attempts, seconds in results:
+                record = {
+                    "strategy": strategy,
+                    "seed": args.seed,
+                    "game": game_num,
+                    "targets": target_words,
+                    "attempts": game_attempts,
+                    "seconds": seconds,
+                }
+                file.write(json.dumps(record) + "\n")
+            attempts[strategy] = [game_attempts for _, _, game_attempts, _ in results]
+            summaries[strategy] = summary
+            print(f"{strategy}: average {summary['average']:.3f} attempts, {summary['wall_time']:.1f} s")
+
+    reference = args.reference or args.strategies[0]
+    if reference in attempts:
+        print(f"\npaired difference in attempts vs {reference} (95% CI):")
+        for strategy in args.strategies:
+            if strategy == reference:
+                continue
+            mean, half_width = paired_difference(attempts[reference], attempts[strategy])
+            print(f"{strategy}: {mean:+.3f} +/- {half_width:.3f}")
+    print(f"\nper-game results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Vectorized CSP word scoring and solver state shared by the CSP, hybrid and
+balanced approaches."""
+
+import hashlib
+import math
+
+import numpy as np
+
+from feedback import (
+    NUM_CODES, encode_dictionary, encode_feedback, filter_candidates, guess_entropies, load_feedback_table, num_answers,
+)
+from solver import Solver
+
+# hyper parameters
+CORRECT_POSITION_MATCH_REWARD = 10
+CORRECT_LETTER_CONTAINS_REWARD = 5
+INCORRECT_LETTER_PENALTY = -100
+UNCOMMON_LETTER_PENALTY = -0.5
+UNCOMMON_LETTERS = ["q", "j", "z", "x", "v", "k", "w"]
+
+
+# score contribution of a single past guess and its feedback vector for every
+# word in the dictionary
+def guess_scores(letters, masks, guess, feedback):
+    guess_letters = [ord(c) - ord("a") for c in guess]
+    scores = np.zeros(len(letters))
+    for i, (guess_letter, guess_fb) in enumerate(zip(guess_letters, feedback)):
+        in_place = letters[:, i] == guess_letter
+        contains = ((masks >> np.uint32(guess_letter)) & 1).astype(bool)
+        if guess_fb == 2:  # guess letter is in the correct position of target word
+            scores += np.where(in_place, CORRECT_POSITION_MATCH_REWARD, INCORRECT_LETTER_PENALTY)
+        elif guess_fb == 1:  # guess letter is in the target word but in the wrong position
+            scores += np.where(contains & ~in_place, CORRECT_LETTER_CONTAINS_REWARD, INCORRECT_LETTER_PENALTY)
+        elif guess_fb == 0:  # guess letter is not in the target word
+            scores += np.where(contains, INCORRECT_LETTER_PENALTY, 0)
+
+    # the guess itself is known not to be the target
+    is_guess = np.all(letters == np.array(guess_letters, dtype=np.uint8), axis=1)
+    scores[is_guess] = INCORRECT_LETTER_PENALTY
+    return scores
+
+
+# slight penalty for every distinct uncommon letter in a word
+def uncommon_penalty(masks):
+    penalty = np.zeros(len(masks))
+    for uncommon in UNCOMMON_LETTERS:
+        penalty += ((masks >> np.uint32(ord(uncommon) - ord("a"))) & 1) * UNCOMMON_LETTER_PENALTY
+    return penalty
+
+
+# CSP score of every word in word_list given the guesses so far and their
+# feedback vectors, returned as an array aligned with word_list
+def score_words(word_list, guesses, feedback_matrix):
+    letters, masks = encode_dictionary(word_list)
+    scores = uncommon_penalty(masks)
+    for guess, feedback in zip(guesses, feedback_matrix):
+        scores += guess_scores(letters, masks, guess, feedback)
+    return scores
+
+
+# (word, score) pairs sorted by score in descending order; the sort is stable,
+# so ties keep word list order. As in the original scoring loop, scores are
+# ints unless an uncommon letter penalty applied, so ratings print as 25
+# rather than 25.0
+def rank_words(word_list, scores):
+    order = np.argsort(-scores, kind="stable")
+    _, masks = encode_dictionary(word_list)
+    penalized = (uncommon_penalty(masks) != 0)[order].tolist()
+    return [
+        (word_list[i], score if is_penalized else int(score))
+        for i, score, is_penalized in zip(order.tolist(), scores[order].tolist(), penalized)
+    ]
+
+
+# keeps each word's running CSP score so a new turn only scores the newest
+# guess instead of the whole history; scores always equal
+# score_words(word_list, guesses, feedback_matrix) for the guesses added so far
+class IncrementalScorer:
+    def __init__(self, word_list):
+        self.word_list = word_list
+        self.letters, self.masks = encode_dictionary(word_list)
+        self.scores = uncommon_penalty(self.masks)
+        self.num_guesses = 0
+
+    def add(self, guess, feedback):
+        self.scores += guess_scores(self.letters, self.masks, guess, feedback)
+        self.num_guesses += 1
+
+    def ranked(self):
+        return rank_words(self.word_list, self.scores)
+
+
+# slack added to the entropy upper bound so rounding in the computed
+# entropies can never make the bound prune a word that would have won
+ENTROPY_BOUND_SLACK = 1e-9
+
+
+# the choice make_guess(ratings, csp_weight, entropy_weight) makes, for
+# ratings shaped like calc_entropy's, without computing every entropy.
+# csps[i] is the CSP value of the i-th rating, scored[i] says whether its
+# entropy is computed (unscored ratings are (0, 0)) and entropies(positions)
+# returns the entropies of scored positions as a list. Scored words are
+# visited in descending CSP order, a block at a time, until none of the rest
+# could beat the best score even with max_entropy bits; ties still go to the
+# earliest rating. Returns the position of the chosen rating, or None.
+def pruned_guess(csps, scored, entropies, max_entropy, csp_weight, entropy_weight, block=64):
+    positions = np.flatnonzero(scored)
+    if csp_weight >= 0:
+        positions = positions[np.argsort(-csps[positions], kind="stable")]
+    bound_entropy = max(max_entropy * entropy_weight, 0) + ENTROPY_BOUND_SLACK
+
+    best_score = None
+    best_position = None
+    for start in range(0, len(positions), block):
+        if (
+            best_score is not None
+            and csp_weight >= 0
+            and csps[positions[start]].item() * csp_weight + bound_entropy < best_score
+        ):
+            break
+        batch = positions[start:start + block]
+        for position, csp, entropy in zip(batch.tolist(), csps[batch].tolist(), entropies(batch)):
+            score = csp * csp_weight + entropy * entropy_weight
+            if best_score is None or score > best_score or (score == best_score and position < best_position):
+                best_score = score
+                best_position = position
+
+    # unscored ratings all score 0, so only the first of them can win
+    unscored = np.flatnonzero(~scored)
+    if len(unscored) and (best_score is None or 0 > best_score or (0 == best_score and unscored[0] < best_position)):
+        best_score = 0
+        best_position = int(unscored[0])
+    if best_score is None or not best_score > -1:
+        return None
+    return best_position
+
+
+# the upper bound on the entropy of a partition of n targets into feedback codes
+def max_entropy(n):
+    return math.log2(min(n, NUM_CODES)) if n > 0 else 0.0
+
+
+# the ratings calc_entropy builds from the CSP scores, as arrays: the
+# rank_words order of the words, the CSP value of each rating and whether
+# calc_entropy computes an entropy for it
+def rating_arrays(guesses, scores, word_list):
+    word_index, _ = load_feedback_table(word_list)
+    order = np.argsort(-scores, kind="stable")
+    csps = scores[order]
+    guessed = np.zeros(len(word_list), dtype=bool)
+    guessed[[word_index[guess] for guess in guesses]] = True
+    return order, csps, (csps > 0) & ~guessed[order]
+
+
+# make_guess(calc_entropy(guesses, rank_words(word_list, scores), word_list,
+# candidates), csp_weight, entropy_weight) computed with pruned_guess straight
+# from the CSP score array, so most entropies are never evaluated. entropies
+# maps an array of guess indices to their entropies over the candidates and
+# defaults to computing them with guess_entropies.
+def select_guess(guesses, scores, word_list, candidates, csp_weight, entropy_weight, entropies=None):
+    _, feedback_codes = load_feedback_table(word_list)
+    candidate_idx = np.arange(num_answers(word_list)) if candidates is None else candidates
+    if entropies is None:
+        def entropies(guess_idx):
+            return guess_entropies(feedback_codes, guess_idx, candidate_idx)
+
+    order, csps, scored = rating_arrays(guesses, scores, word_list)
+    position = pruned_guess(
+        csps, scored, lambda positions: entropies(order[positions]).tolist(),
+        max_entropy(len(candidate_idx)), csp_weight, entropy_weight,
+    )
+    return None if position is None else word_list[order[position]]
+
+
+# shared state for the CSP, hybrid and balanced solvers: the guess history,
+# per-board feedback, running CSP scores and (in candidate-aware mode) the
+# targets still consistent with each board's feedback. Subclasses implement
+# choose_guess() to rank the words for the next turn. opening_book is an
+# optional 243 x 243 table of precomputed second guesses (see opening_book.py).
+class CSPSolver(Solver):
+    opener = "tares"
+    supports_opening_book = True
+
+    def __init__(self, word_list, csp_weight=1, entropy_weight=1, candidate_aware=False, opening_book=None):
+        self.csp_weight = csp_weight
+        self.entropy_weight = entropy_weight
+        self.candidate_aware = candidate_aware
+        self.opening_book = opening_book
+        super().__init__(word_list)
+
+    def reset(self):
+        self.left_word_solved = False
+        self.right_word_solved = False
+        self.guesses = []
+        self.feedback_matrix1 = []
+        self.feedback_matrix2 = []
+        self.best_guess = None
+
+        # running CSP scores per board, updated with only the newest guess each turn
+        self.scorer_left = IncrementalScorer(self.word_list)
+        self.scorer_right = IncrementalScorer(self.word_list)
+
+        # in candidate-aware mode entropy is computed over the targets still
+        # consistent with each board's feedback instead of the whole dictionary
+        self.candidates_left = None
+        self.candidates_right = None
+        if self.candidate_aware:
+            self.candidates_left = np.arange(num_answers(self.word_list))
+            self.candidates_right = np.arange(num_answers(self.word_list))
+
+    def suggest(self):
+        if self.guesses and self.best_guess is None:
+            self.best_guess = self.book_guess() or self.choose_guess()
+        return self.best_guess or self.opener
+
+    # the precomputed second guess after the opener, if there is one
+    def book_guess(self):
+        if self.opening_book is None or self.guesses != [self.opener]:
+            return None
+        index = self.opening_book[encode_feedback(self.feedback_matrix1[0]), encode_feedback(self.feedback_matrix2[0])]
+        return self.word_list[index] if index >= 0 else None
+
+    def observe(self, guess, feedback_left, feedback_right):
+        if feedback_left.count(2) == 5:
+            self.left_word_solved = True
+
+        if feedback_right.count(2) == 5:
+            self.right_word_solved = True
+
+        self.guesses.append(guess)
+        self.feedback_matrix1.append(feedback_left)
+        self.feedback_matrix2.append(feedback_right)
+        self.scorer_left.add(guess, feedback_left)
+        self.scorer_right.add(guess, feedback_right)
+
+        if self.candidate_aware:
+            word_index, feedback_codes = load_feedback_table(self.word_list)
+            if not self.left_word_solved:
+                self.candidates_left = filter_candidates(feedback_codes, self.candidates_left, word_index[guess], encode_feedback(feedback_left))
+            if not self.right_word_solved:
+                self.candidates_right = filter_candidates(feedback_codes, self.candidates_right, word_index[guess], encode_feedback(feedback_right))
+
+        self.best_guess = None
+
+    def choose_guess(self):
+        raise NotImplementedError
+
+    def settings(self):
+        return {
+            **super().settings(),
+            "csp_weight": self.csp_weight,
+            "entropy_weight": self.entropy_weight,
+            "candidate_aware": self.candidate_aware,
+            "opening_book": None if self.opening_book is None else hashlib.sha256(self.opening_book.tobytes()).hexdigest(),
+            "rewards": (CORRECT_POSITION_MATCH_REWARD, CORRECT_LETTER_CONTAINS_REWARD, INCORRECT_LETTER_PENALTY),
+            "uncommon": (UNCOMMON_LETTER_PENALTY, tuple(UNCOMMON_LETTERS)),
+        }
+
+    def shared_state(self):
+        encodings = [array for scorer in (self.scorer_left, self.scorer_right) for array in (scorer.letters, scorer.masks)]
+        return super().shared_state() + [self.opening_book] + encodings
+
+    # the opener is played without being announced
+    def print_guess(self, attempt, attempts, guess):
+        print(f"Attempt {attempt}/{attempts} - Enter your guess: ")
+        if attempt > 1:
+            print("Guess is: ", guess)
+
+    # print the positively scored words with their CSP and entropy values
+    def print_ratings(self, entropy_score_ratings):
+        print("Scored words (best guesses at the top):")
+        for word, (csp_score, entropy) in entropy_score_ratings.items():
+            if csp_score <= 0:
+                break
+            print(f"{word}: {csp_score}, {entropy}")
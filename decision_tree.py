@@ -0,0 +1,230 @@
+"""Offline compiler for a complete Dordle policy as a decision tree.
+
+Usage: python decision_tree.py <strategy> [--answers FILE] [--max-depth D]
+                               [--processes P] [--output FILE]
+
+The compiler plays the strategy's solver against every reachable state: at
+each node it asks the solver for its guess, splits each unsolved board's
+remaining targets by feedback code and recurses into every (left code,
+right code) pair. Identical subtrees are stored once. The result is saved as
+flat arrays, and TreeSolver replays it with one lookup per guess, falling
+back to the live solver for states outside the tree (targets not in the
+answer set or games deeper than max_depth).
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+import verbosity
+from feedback import (
+    NUM_CODES, SOLVED_CODE, SharedDictionary, answer_words, decode_feedback, dictionary_pool, encode_feedback,
+    load_feedback_table, load_word_lists, word_list_hash,
+)
+from solver import Solver, make_solver
+
+
+# hash-consed node store: a node is (guess index, edge keys, child ids) where
+# an edge key is left_code * 243 + right_code; identical subtrees share an id
+class NodeTable:
+    def __init__(self):
+        self.nodes = []
+        self.ids = {}
+
+    def intern(self, guess, keys, children):
+        node = (guess, tuple(keys), tuple(children))
+        if node not in self.ids:
+            self.ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return self.ids[node]
+
+
+# the (left code, right code, child candidates) triples reachable after guess,
+# one at a time; candidates holds each board's remaining target indices
+# (None once solved)
+def expand(candidates, guess, feedback_codes):
+    splits = []
+    for board in candidates:
+        if board is None:
+            splits.append([(SOLVED_CODE, None)])
+            continue
+        codes = feedback_codes[guess, board]
+        splits.append([(int(code), board[codes == code]) for code in np.unique(codes)])
+
+    for left_code, left in splits[0]:
+        for right_code, right in splits[1]:
+            if left_code == SOLVED_CODE and right_code == SOLVED_CODE:
+                continue  # both boards solved, the game ends here
+            yield left_code, right_code, (
+                None if left_code == SOLVED_CODE else left,
+                None if right_code == SOLVED_CODE else right,
+            )
+
+
+# each child explores its branch on a clone of the solver, so only the
+# solvers on the current path are alive at once
+def compile_subtree(solver, candidates, word_list, depth, max_depth, table):
+    word_index, feedback_codes = load_feedback_table(word_list)
+    guess = word_index[solver.suggest()]
+    keys = []
+    child_ids = []
+    if depth < max_depth:
+        for left_code, right_code, child_candidates in expand(candidates, guess, feedback_codes):
+            child = solver.clone()
+            child.observe(word_list[guess], decode_feedback(left_code), decode_feedback(right_code))
+            keys.append(left_code * NUM_CODES + right_code)
+            child_ids.append(compile_subtree(child, child_candidates, word_list, depth + 1, max_depth, table))
+    return table.intern(guess, keys, child_ids)
+
+
+# worker entry point: compile the subtree after history, a list of (guess
+# index, left code, right code) turns, into a private node table. The
+# worker's own solver replays the history, so no solver is sent to it.
+def _compile_child(args):
+    strategy, word_list, targets, history, max_depth = args
+    _, feedback_codes = load_feedback_table(word_list)
+    table = NodeTable()
+    with verbosity.verbose(False):
+        solver = make_solver(strategy, word_list)
+        candidates = (targets, targets)
+        for guess, left_code, right_code in history:
+            solver.observe(word_list[guess], decode_feedback(left_code), decode_feedback(right_code))
+            candidates = tuple(
+                None if code == SOLVED_CODE else board[feedback_codes[guess, board] == code]
+                for board, code in zip(candidates, (left_code, right_code))
+            )
+        root = compile_subtree(solver, candidates, word_list, len(history) + 1, max_depth, table)
+    return table.nodes, root
+
+
+# copy a worker's nodes into table (children come before their parents)
+def merge_nodes(table, nodes, root):
+    ids = []
+    for guess, keys, children in nodes:
+        ids.append(table.intern(guess, keys, [ids[child] for child in children]))
+    return ids[root]
+
+
+# each of the root's children is one job; the jobs are small, and a chunk
+# of them pickles the word list once
+def compile_tree(strategy, word_list, answers=None, max_depth=100, processes=None):
+    word_index, feedback_codes = load_feedback_table(word_list)
+    targets = np.array(sorted(word_index[word] for word in (answers or answer_words(word_list))))
+    table = NodeTable()
+
+    with verbosity.verbose(False):
+        guess = word_index[make_solver(strategy, word_list).suggest()]
+    codes = []
+    if max_depth > 1:
+        codes = [(left, right) for left, right, _ in expand((targets, targets), guess, feedback_codes)]
+    jobs = ((strategy, word_list, targets, [(guess, left, right)], max_depth) for left, right in codes)
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        child_ids = [merge_nodes(table, *_compile_child(job)) for job in jobs]
+    else:
+        chunk_size = max(1, len(codes) // (processes * 4))
+        with SharedDictionary(word_list) as shared, dictionary_pool(processes, shared) as pool:
+            child_ids = [merge_nodes(table, *result) for result in pool.imap(_compile_child, jobs, chunk_size)]
+
+    keys = [left_code * NUM_CODES + right_code for left_code, right_code in codes]
+    root = table.intern(guess, keys, child_ids)
+    return to_arrays(table, root, word_list)
+
+
+# flatten the node table into arrays: guesses[n] is node n's guess, and its
+# edges are keys/children[offsets[n]:offsets[n + 1]] with keys sorted
+def to_arrays(table, root, word_list):
+    guesses = np.array([guess for guess, _, _ in table.nodes], dtype=np.int32)
+    offsets = np.zeros(len(table.nodes) + 1, dtype=np.int64)
+    keys = []
+    children = []
+    for n, (_, node_keys, node_children) in enumerate(table.nodes):
+        order = np.argsort(node_keys)
+        keys.extend(node_keys[i] for i in order)
+        children.extend(node_children[i] for i in order)
+        offsets[n + 1] = len(keys)
+    return {
+        "guesses": guesses,
+        "offsets": offsets,
+        "keys": np.array(keys, dtype=np.uint16),
+        "children": np.array(children, dtype=np.int32),
+        "root": np.array(root),
+        "word_hash": np.array(word_list_hash(word_list)),
+    }
+
+
+def save_tree(tree, path):
+    np.savez_compressed(path, **tree)
+
+
+def load_tree(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+# plays a compiled tree; fallback is the live solver used once the game
+# leaves the tree, rebuilt by replaying the observations so far
+class TreeSolver(Solver):
+    def __init__(self, word_list, tree, fallback):
+        if str(tree["word_hash"]) != word_list_hash(word_list):
+            raise ValueError("decision tree was compiled for a different word list")
+        self.tree = tree
+        self.fallback = fallback
+        super().__init__(word_list)
+
+    def reset(self):
+        self.node = int(self.tree["root"])
+        self.history = []
+        self.fallback_active = False
+
+    def suggest(self):
+        if self.node is not None:
+            return self.word_list[self.tree["guesses"][self.node]]
+        if not self.fallback_active:
+            self.fallback.reset()
+            for observation in self.history:
+                self.fallback.observe(*observation)
+            self.fallback_active = True
+        return self.fallback.suggest()
+
+    def shared_state(self):
+        return super().shared_state() + [self.tree] + self.fallback.shared_state()
+
+    def observe(self, guess, feedback_left, feedback_right):
+        self.history.append((guess, feedback_left, feedback_right))
+        if self.fallback_active:
+            self.fallback.observe(guess, feedback_left, feedback_right)
+            return
+        if self.node is None:
+            return
+
+        key = encode_feedback(feedback_left) * NUM_CODES + encode_feedback(feedback_right)
+        start, stop = self.tree["offsets"][self.node], self.tree["offsets"][self.node + 1]
+        i = start + np.searchsorted(self.tree["keys"][start:stop], key)
+        if i < stop and self.tree["keys"][i] == key:
+            self.node = int(self.tree["children"][i])
+        else:
+            self.node = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a strategy into a decision tree.")
+    parser.add_argument("strategy")
+    parser.add_argument("--answers", default=None, help="file of possible targets (default: every word)")
+    parser.add_argument("--max-depth", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--words", default="words.txt")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words, args.answers)
+    tree = compile_tree(args.strategy, word_list, max_depth=args.max_depth, processes=args.processes)
+    output = args.output or f"tree_{args.strategy}.npz"
+    save_tree(tree, output)
+    print(f"{args.strategy}: {len(tree['guesses'])} nodes, {len(tree['keys'])} edges written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,75 +5,54 @@ import sys
 import numpy as np
 import time
 
-# ANSI escape codes for colors
-COLORS = {
-    "green": "\033[92m",
-    "yellow": "\033[93m",
-    "gray": "\033[90m",
-    "reset": "\033[0m",
-}
-
-
-# helper function to get vectorized feedback
-# [0] indicates "gray letter"
-# [1] indicates "yellow letter"
-# [2] indicates "green letter"
-def get_vector_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(2)
-        elif letter in target:
-            feedback.append(1)
-        else:
-            feedback.append(0)
-    return feedback
-
-
-# helper function to get feedback and format with colors
-def get_colored_feedback(guess, target):
-    feedback = []
-    for i, letter in enumerate(guess):
-        if letter == target[i]:
-            feedback.append(COLORS["green"] + letter + COLORS["reset"])
-        elif letter in target:
-            feedback.append(COLORS["yellow"] + letter + COLORS["reset"])
-        else:
-            feedback.append(COLORS["gray"] + letter + COLORS["reset"])
-    return "".join(feedback)
-
-
-def make_guess(guessed_words, candidate_list, word_list, word_4_correct, wrong_guess_made):
-    max_entropy = -1
+import profiling
+import verbosity
+from feedback import (
+    encode_dictionary, encode_feedback, guess_entropies, load_feedback_table, num_answers, sampled_guess_entropies,
+)
+from solver import Solver, play_game
+from state_cache import BOARD_CACHE_BYTES, board_turn, index_width, shared_cache
+
+# 26-bit mask with every letter allowed
+ALL_LETTERS = (1 << 26) - 1
+
+
+# candidate state for one board: a boolean mask over word indices (only the
+# answers start as candidates), a 26-bit mask of the letters still possible
+# at each position and a 26-bit mask of the letters known to be in the word
+class BoardState:
+    def __init__(self, word_list):
+        letters, self.word_masks = encode_dictionary(word_list)
+        self.letter_bits = np.uint32(1) << letters.astype(np.uint32)
+        self.candidates = np.zeros(len(word_list), dtype=bool)
+        self.candidates[:num_answers(word_list)] = True
+        self.possible_letters = np.full(5, ALL_LETTERS, dtype=np.uint32)
+        self.correct_letters = np.uint32(0)
+
+
+# with entropy_tolerance, entropies are estimated from a sample of the
+# candidates (see feedback.sampled_guess_entropies) and the top_k are rescored
+def make_guess(guessed_words, board, word_list, word_4_correct, wrong_guess_made, entropy_tolerance=None, top_k=32):
     best_guess = None
-    guess_list = candidate_list
+
+    # feedback codes are looked up by word index instead of recomputed
+    _, feedback_codes = load_feedback_table(word_list)
+    candidate_idx = np.flatnonzero(board.candidates)
+    guess_idx = candidate_idx
 
     # If the agent satisfies the wrong guess condition
-    if not wrong_guess_made and word_4_correct and len(candidate_list) >= 3:
-        guess_list = word_list
+    if not wrong_guess_made and word_4_correct and len(candidate_idx) >= 3:
+        guess_idx = np.arange(len(word_list))
         wrong_guess_made = True
 
-    for guess in guess_list:
-        if guess in guessed_words:
-            continue
-
-        feedback_counts = {}
-        for target in candidate_list:
-            # feedback mimics the response you'd receive in a game of Wordle
-            # converts to tuple to use as keys in a dictionary
-            feedback = tuple(get_vector_feedback(guess, target))
-            # get(key, default)
-            feedback_counts[feedback] = feedback_counts.get(feedback, 0) + 1
-
-        total = sum(feedback_counts.values())
-        entropy = 0
-        for count in feedback_counts.values():
-            p = count / total
-            entropy -= p * np.log2(p) if p > 0 else 0
-
-        if entropy > max_entropy:
-            max_entropy = entropy
-            best_guess = guess
+    guess_idx = [i for i in guess_idx if word_list[i] not in guessed_words]
+    if guess_idx:
+        # entropy of every guess in one call; argmax keeps the first best guess
+        if entropy_tolerance is None:
+            entropies = guess_entropies(feedback_codes, guess_idx, candidate_idx)
+        else:
+            entropies = sampled_guess_entropies(feedback_codes, guess_idx, candidate_idx, entropy_tolerance, top_k)
+        best_guess = word_list[guess_idx[int(np.argmax(entropies))]]
 
     return best_guess, wrong_guess_made
 
@@ -82,183 +61,122 @@ def update(
     guess,
     vector_feedback1,
     guessed_words,
-    candidate_list,
-    correct_letters,
-    possible_letters,
+    board,
+    word_list,
 ):
     # add guess to guessed_words set
     guessed_words.add(guess)
+    word_index, _ = load_feedback_table(word_list)
 
     # update conditions based on guess
+    possible_letters = board.possible_letters
     for i, result in enumerate(vector_feedback1):
+        bit = np.uint32(1 << (ord(guess[i]) - ord("a")))
         if result == 0:  # gray
-            [
-                possible_letters[j].remove(guess[i])
-                for j in range(5)
-                if guess[i] in possible_letters[j]
-            ]
+            possible_letters &= ~bit
         elif result == 1:  # yellow
-            if guess[i] in possible_letters[i]:
-                possible_letters[i].remove(guess[i])
-            correct_letters.add(guess[i])
+            possible_letters[i] &= ~bit
+            board.correct_letters |= bit
         else:  # green
-            possible_letters[i] = set(guess[i])
-            correct_letters.add(guess[i])
+            possible_letters[i] = bit
+            board.correct_letters |= bit
 
-    new_candidate_list = []
     # eliminate words that don't meet conditions
-    for word in candidate_list:
-        possible_candidate = True
+    candidates = board.candidates
+    for i in range(5):
         # if a letter is not possible in that position
-        for i, letter in enumerate(word):
-            if letter not in possible_letters[i]:
-                possible_candidate = False
-                break
-        if not correct_letters.issubset(set(word)):
-            possible_candidate = False
-        if word in guessed_words:
-            possible_candidate = False
-        if possible_candidate:
-            new_candidate_list.append(word)
-    # Need to update the list in place
-    candidate_list.clear()
-    candidate_list.extend(new_candidate_list)
-
-
-def game(target_words, word_list):
-
-    attempts = 100
-
-    attempt = 1
-    left_word_solved = False
-    right_word_solved = False
-    left_word_wrong_guess_made = False
-    right_word_wrong_guess_made = False
-    left_word_4_correct = False
-    right_word_4_correct = False
-
-    # initialize agent
-    candidate_list_left = word_list.copy()
-    candidate_list_right = word_list.copy()
-
-    # sort candidate_list before starting
-
-    guessed_words_left = set()
-    correct_letters_left = set()
-    possible_letters_left = [set("abcdefghijklmnopqrstuvwxyz").copy() for i in range(5)]
-
-    guessed_words_right = set()
-    correct_letters_right = set()
-    possible_letters_right = [
-        set("abcdefghijklmnopqrstuvwxyz").copy() for i in range(5)
-    ]
-
-    # main game loop
-    while attempt <= attempts:
-
-        # guess = input(
-        #     f"Attempt {attempt}/{attempts} - Enter your guess: "
-        # ).lower()  # user's word guess
-        # guess = make_guess(
-        #     guessed_words, candidate_list, correct_letters, possible_letters
-        # )
-        guess = ""
-
-        if not left_word_solved and not right_word_solved:  # priority to left word
-            guess, left_word_wrong_guess_made = make_guess(guessed_words_left, candidate_list_left, word_list, left_word_4_correct, left_word_wrong_guess_made)
-
-            # add to guessed words list
-            guessed_words_left.add(guess)
-            guessed_words_right.add(guess)
-
-        elif left_word_solved and not right_word_solved:  # solve right word
-            guess, right_word_wrong_guess_made = make_guess(guessed_words_right, candidate_list_right, word_list, right_word_4_correct, right_word_wrong_guess_made)
-
-            # add to guessed words list
-            guessed_words_left.add(guess)
-
-        elif not left_word_solved and right_word_solved:  # solve left word
-            guess, left_word_wrong_guess_made = make_guess(guessed_words_left, candidate_list_left, word_list, left_word_4_correct, left_word_wrong_guess_made)
-
-            # add to guessed words list
-            guessed_words_left.add(guess)
-
-        else:
-            print("ERROR 1")
-
-        # display feedback for each target word with colored output
-        colored_feedback1 = (
-            get_colored_feedback(target_words[0], target_words[0])
-            if left_word_solved
-            else get_colored_feedback(guess, target_words[0])
+        candidates &= (board.letter_bits[:, i] & possible_letters[i]) != 0
+    candidates &= (board.word_masks & board.correct_letters) == board.correct_letters
+    candidates[word_index[guess]] = False
+
+
+# the active board's guess depends only on that board's (guess, feedback)
+# history, so with board_cache it is shared with every game that reaches the
+# same board state. entropy_tolerance (in bits) turns on sampled entropies.
+class EntropySolver(Solver):
+    def __init__(self, word_list, board_cache=True, entropy_tolerance=None, top_k=32):
+        self.entropy_tolerance = entropy_tolerance
+        self.top_k = top_k
+        self.board_cache = None
+        if board_cache:
+            namespace = "entropy-boards" if entropy_tolerance is None else f"entropy-boards-{entropy_tolerance}-{top_k}"
+            self.board_cache = shared_cache(namespace, word_list, BOARD_CACHE_BYTES)
+        self.index_width = index_width(word_list)
+        super().__init__(word_list)
+
+    def reset(self):
+        self.left_word_solved = False
+        self.right_word_solved = False
+        self.word_4_correct = [False, False]
+        self.wrong_guess_made = [False, False]
+
+        # initialize agent
+        self.boards = [BoardState(self.word_list), BoardState(self.word_list)]
+        self.guessed_words = [set(), set()]
+        self.board_histories = [bytearray(), bytearray()]
+
+    def settings(self):
+        return {**super().settings(), "entropy_tolerance": self.entropy_tolerance, "top_k": self.top_k}
+
+    def shared_state(self):
+        boards = [array for board in self.boards for array in (board.letter_bits, board.word_masks)]
+        return super().shared_state() + [self.board_cache] + boards
+
+    # priority to left word, then the right word once the left is solved
+    def active_board(self):
+        return 0 if not self.left_word_solved else 1
+
+    def suggest(self):
+        side = self.active_board()
+        key = None
+        if self.board_cache is not None:
+            key = bytes(self.board_histories[side]) + bytes([self.wrong_guess_made[side]])
+            guess = self.board_cache.get(key)
+            if guess is not None:
+                return guess
+
+        guess, _ = make_guess(
+            self.guessed_words[side],
+            self.boards[side],
+            self.word_list,
+            self.word_4_correct[side],
+            self.wrong_guess_made[side],
+            self.entropy_tolerance,
+            self.top_k,
         )
-        colored_feedback2 = (
-            get_colored_feedback(target_words[1], target_words[1])
-            if right_word_solved
-            else get_colored_feedback(guess, target_words[1])
-        )
-
-        # get vectorized feeback to be supplied to model
-        vector_feedback1 = (
-            get_vector_feedback(target_words[0], target_words[0])
-            if left_word_solved
-            else get_vector_feedback(guess, target_words[0])
-        )
-        vector_feedback2 = (
-            get_vector_feedback(target_words[1], target_words[1])
-            if right_word_solved
-            else get_vector_feedback(guess, target_words[1])
-        )
-
-        if vector_feedback1.count(2) == 4:
-            left_word_4_correct = True
-
-        if vector_feedback2.count(2) == 4:
-            right_word_4_correct = True
+        if key is not None and guess is not None:
+            self.board_cache.put(key, guess)
+        return guess
 
-        if guess == target_words[0]:
-            left_word_solved = True
+    def observe(self, guess, feedback_left, feedback_right):
+        # the wrong guess condition is checked against the state the guess was made in
+        side = self.active_board()
+        if (
+            not self.wrong_guess_made[side]
+            and self.word_4_correct[side]
+            and np.count_nonzero(self.boards[side].candidates) >= 3
+        ):
+            self.wrong_guess_made[side] = True
 
-        if guess == target_words[1]:
-            right_word_solved = True
+        for side, vector_feedback in enumerate((feedback_left, feedback_right)):
+            if vector_feedback.count(2) == 4:
+                self.word_4_correct[side] = True
 
-        # update based on feedback
-        update(
-            guess,
-            vector_feedback1,
-            guessed_words_left,
-            candidate_list_left,
-            correct_letters_left,
-            possible_letters_left,
-        )
-
-        update(
-            guess,
-            vector_feedback2,
-            guessed_words_right,
-            candidate_list_right,
-            correct_letters_right,
-            possible_letters_right,
-        )
-
-        print(
-            f"{colored_feedback1} | {colored_feedback2} --> vectorized feedback: {vector_feedback1} | {vector_feedback2}"
-        )
+            # update based on feedback
+            update(guess, vector_feedback, self.guessed_words[side], self.boards[side], self.word_list)
+            if self.board_cache is not None:
+                word_index, _ = load_feedback_table(self.word_list)
+                self.board_histories[side] += board_turn(word_index[guess], encode_feedback(vector_feedback), self.index_width)
 
-        # check end game conditions
-        if left_word_solved and right_word_solved:
-            print(f"Congratulations! You guessed both words, in {attempt} attempts!\n")
-            break
+        if feedback_left.count(2) == 5:
+            self.left_word_solved = True
 
-        # kill game if on last attempt
-        if attempt == attempts:
-            print("Game over! Better luck next time.")
-            print(f"The words were: {target_words}\n")
-            break
+        if feedback_right.count(2) == 5:
+            self.right_word_solved = True
 
-        attempt += 1
 
-    return attempt
+def game(target_words, word_list, board_cache=True):
+    return play_game(EntropySolver(word_list, board_cache=board_cache), target_words)
 
 
 def preprocess_data(filename):
@@ -268,6 +186,7 @@ def preprocess_data(filename):
 
 
 def main():
+    profiling.enable_from_env()
 
     total_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
 
@@ -282,15 +201,18 @@ def main():
     start_time = time.time()
     while game_num <= total_games:
         target_words = random.sample(word_list, 2)  # select two target words
-        print("target words: ", target_words)
-        print("*** WELCOME TO A NEW GAME OF DORDLE ***")
+        if verbosity.VERBOSE:
+            print("target words: ", target_words)
+            print("*** WELCOME TO A NEW GAME OF DORDLE ***")
         game_attempt = game(target_words, word_list)
         num_attempts += game_attempt
         game_num += 1
         num_total_attempts[game_attempt] = num_total_attempts.get(game_attempt, 0) + 1
-        print(num_total_attempts)
+        if verbosity.VERBOSE:
+            print(num_total_attempts)
 
     end_time = time.time()
+    profiling.finish()
 
     print("total games", total_games)
     average = float(num_attempts / total_games)
@@ -0,0 +1,498 @@
+"""Precomputed guess x target feedback codes shared by every solver."""
+
+import hashlib
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# feedback vectors are stored as base-3 codes: position i contributes
+# vector[i] * 3**i, so [0, 0, 0, 0, 0] -> 0 and [2, 2, 2, 2, 2] -> 242
+NUM_CODES = 243
+SOLVED_CODE = 242
+POWERS = np.array([1, 3, 9, 27, 81], dtype=np.uint8)
+
+# bump whenever feedback_block changes so stale cache files are not reused
+FEEDBACK_RULE = "green-in-place/yellow-anywhere/v1"
+
+# on-disk cache of feedback matrices, opened with memory mapping so separate
+# processes share one page-cached copy
+CACHE_DIR = os.environ.get(
+    "DORDLE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".feedback_cache")
+)
+
+# word lists whose N x N matrix would exceed this many bytes get a
+# FeedbackKernel that computes codes on demand instead
+MAX_MATRIX_BYTES = int(os.environ.get("DORDLE_MAX_MATRIX_MB", "1024")) << 20
+
+# working memory a FeedbackKernel may use for temporaries while computing codes
+KERNEL_MEMORY_BYTES = 64 << 20
+
+# feedback tables already loaded in this process, keyed by cache key
+_tables = {}
+
+# letter encodings already built in this process, keyed by word list hash
+_encodings = {}
+
+# (word list, word_list_hash) of the plain lists hashed most recently, newest
+# last; WordList objects keep their hash themselves
+_recent_hashes = []
+MAX_RECENT_HASHES = 4
+
+# shared memory segments attached by this process, kept open while in use
+_segments = {}
+
+
+# helper function to turn a feedback vector (list of 0/1/2) into its code
+def encode_feedback(vector):
+    code = 0
+    for i, value in enumerate(vector):
+        code += value * 3 ** i
+    return code
+
+
+# helper function to turn a feedback code back into a feedback vector
+def decode_feedback(code):
+    vector = []
+    for _ in range(5):
+        vector.append(code % 3)
+        code //= 3
+    return vector
+
+
+# encode each word as a row of letter indices (a=0 ... z=25) plus a 26-bit
+# mask of the letters it contains
+def encode_words(word_list):
+    letters = np.array([[ord(c) - ord("a") for c in word] for word in word_list], dtype=np.uint8)
+    letters = letters.reshape(len(word_list), 5)
+    masks = np.zeros(len(word_list), dtype=np.uint32)
+    for i in range(5):
+        masks |= np.uint32(1) << letters[:, i].astype(np.uint32)
+    return letters, masks
+
+
+# returns (letters, masks) from encode_words, built once per word list
+def encode_dictionary(word_list):
+    key = word_list_hash(word_list)
+    if key not in _encodings:
+        _encodings[key] = encode_words(word_list)
+    return _encodings[key]
+
+
+def index_words(word_list):
+    return {word: i for i, word in enumerate(word_list)}
+
+
+# allowed guesses with the possible answers first: word_list[:num_answers]
+# are the targets, so an answer's index is both its word index and its
+# column in the guesses x answers feedback matrix
+class WordList(list):
+    def __init__(self, words, num_answers=None):
+        super().__init__(words)
+        self.num_answers = len(self) if num_answers is None else num_answers
+
+
+# number of possible targets in word_list (every word for a plain list)
+def num_answers(word_list):
+    return getattr(word_list, "num_answers", len(word_list))
+
+
+def answer_words(word_list):
+    return word_list[:num_answers(word_list)]
+
+
+# read one word per line, checking each is five letters a-z and dropping
+# repeats (the first occurrence keeps its place)
+def read_words(filename):
+    words = {}
+    with open(filename, "r") as file:
+        for line_num, line in enumerate(file, 1):
+            word = line.strip().lower()
+            if not word:
+                continue
+            if len(word) != 5 or not all("a" <= c <= "z" for c in word):
+                raise ValueError(f"{filename}:{line_num}: {word!r} is not a five-letter word")
+            words.setdefault(word, None)
+    return list(words)
+
+
+# the guess list from guess_file as a WordList; with answer_file the answers
+# come first and the remaining guesses follow (answers missing from the
+# guess list are still allowed as guesses), otherwise every word is a target
+def load_word_lists(guess_file, answer_file=None):
+    guesses = read_words(guess_file)
+    if answer_file is None:
+        return WordList(guesses)
+    answers = read_words(answer_file)
+    is_answer = set(answers)
+    return WordList(answers + [word for word in guesses if word not in is_answer], len(answers))
+
+
+# key for a feedback matrix: hash of the word list, its answer count and the
+# feedback rule. Solvers look tables up on every turn, so the key is kept on a
+# WordList (copies and pickles carry it along) and remembered for the last
+# few plain lists; word lists are never modified once loaded.
+def word_list_hash(word_list):
+    digest = getattr(word_list, "_hash", None)
+    if digest is not None:
+        return digest
+    for recent, digest in _recent_hashes:
+        if recent is word_list:
+            return digest
+
+    digest = hashlib.sha256(FEEDBACK_RULE.encode())
+    digest.update("\n".join(word_list).encode())
+    if num_answers(word_list) != len(word_list):
+        digest.update(f"\nanswers={num_answers(word_list)}".encode())
+    digest = digest.hexdigest()
+    if isinstance(word_list, WordList):
+        word_list._hash = digest
+    else:
+        # an entry keeps its list alive, so the identity check stays valid
+        _recent_hashes.append((word_list, digest))
+        del _recent_hashes[:-MAX_RECENT_HASHES]
+    return digest
+
+
+# feedback codes for a block of guesses against a block of targets, following
+# the same rule as get_vector_feedback: green if the letter matches in place,
+# yellow if the target contains the letter anywhere, gray otherwise
+def feedback_block(guess_letters, target_letters, target_masks):
+    codes = np.zeros((len(guess_letters), len(target_letters)), dtype=np.uint8)
+    for i in range(5):
+        green = guess_letters[:, i, None] == target_letters[None, :, i]
+        present = (target_masks[None, :] >> guess_letters[:, i, None].astype(np.uint32)) & 1
+        codes += (present.astype(np.uint8) + green) * POWERS[i]
+    return codes
+
+
+# feedback codes for guess/target letter pairs that are already aligned
+# element by element (same rule as feedback_block)
+def pair_feedback(guess_letters, target_letters, target_masks):
+    codes = np.zeros(len(guess_letters), dtype=np.uint8)
+    for i in range(5):
+        green = guess_letters[:, i] == target_letters[:, i]
+        present = (target_masks >> guess_letters[:, i].astype(np.uint32)) & 1
+        codes += (present.astype(np.uint8) + green) * POWERS[i]
+    return codes
+
+
+# stands in for the feedback matrix of a dictionary too large to precompute:
+# indexing it like the matrix (kernel[g], kernel[g, targets],
+# kernel[np.ix_(guesses, targets)], ...) computes just the requested codes
+# from the letter encoding, in blocks whose temporaries fit in memory_budget.
+# The targets are the first num_targets words (every word by default).
+class FeedbackKernel:
+    dtype = np.dtype(np.uint8)
+    ndim = 2
+
+    # bytes of temporaries per computed code (letter comparisons and shifted masks)
+    BYTES_PER_CODE = 8
+
+    def __init__(self, letters, masks, num_targets=None, memory_budget=KERNEL_MEMORY_BYTES):
+        self.letters = letters
+        self.masks = masks
+        self.memory_budget = memory_budget
+        self.shape = (len(letters), len(letters) if num_targets is None else num_targets)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(rows, slice):
+            rows = np.arange(self.shape[0])[rows]
+        if isinstance(cols, slice):
+            # every row against the selected columns, as matrix[rows][:, cols]
+            return self.block(rows, np.arange(self.shape[1])[cols])
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp))
+        return self.pairs(rows.ravel(), cols.ravel()).reshape(rows.shape)
+
+    # codes for every guess in guess_idx (any shape) against every target in
+    # target_idx: shape guess_idx.shape + (len(target_idx),)
+    def block(self, guess_idx, target_idx):
+        guess_idx = np.asarray(guess_idx, dtype=np.intp)
+        target_idx = np.asarray(target_idx, dtype=np.intp)
+        rows = guess_idx.ravel()
+        codes = np.empty((len(rows), len(target_idx)), dtype=np.uint8)
+        target_letters, target_masks = self.letters[target_idx], self.masks[target_idx]
+        step = max(1, self.memory_budget // (self.BYTES_PER_CODE * max(1, len(target_idx))))
+        for start in range(0, len(rows), step):
+            codes[start:start + step] = feedback_block(
+                self.letters[rows[start:start + step]], target_letters, target_masks
+            )
+        return codes.reshape(guess_idx.shape + (len(target_idx),))
+
+    # codes for the aligned (guess_idx[i], target_idx[i]) pairs
+    def pairs(self, guess_idx, target_idx):
+        codes = np.empty(len(guess_idx), dtype=np.uint8)
+        step = max(1, self.memory_budget // self.BYTES_PER_CODE)
+        for start in range(0, len(guess_idx), step):
+            guesses, targets = guess_idx[start:start + step], target_idx[start:start + step]
+            codes[start:start + step] = pair_feedback(self.letters[guesses], self.letters[targets], self.masks[targets])
+        return codes
+
+
+# guesses x answers matrix of feedback codes (the answers are the first
+# num_answers words)
+def build_feedback_matrix(word_list, block_size=256):
+    letters, masks = encode_words(word_list)
+    n = len(word_list)
+    answers = num_answers(word_list)
+    matrix = np.empty((n, answers), dtype=np.uint8)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        matrix[start:stop] = feedback_block(letters[start:stop], letters[:answers], masks[:answers])
+    return matrix
+
+
+def cache_path(word_list, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, f"feedback_{word_list_hash(word_list)[:32]}.npy")
+
+
+# open a cached matrix read-only with memory mapping, building and writing it
+# first if it is missing or does not match the word list
+def load_cached_matrix(word_list, cache_dir=None):
+    path = cache_path(word_list, cache_dir)
+    shape = (len(word_list), num_answers(word_list))
+    try:
+        matrix = np.load(path, mmap_mode="r")
+        if matrix.shape == shape and matrix.dtype == np.uint8:
+            return matrix
+    except (OSError, ValueError):
+        pass
+
+    matrix = build_feedback_matrix(word_list)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write to a private file and rename so concurrent runs never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.save(file, matrix)
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+# returns (word_index, feedback_codes) where feedback_codes[g, t] is the code
+# for guessing word_list[g] when the target is word_list[t] (t < num_answers);
+# loaded once per word list and shared by every caller in the process. With
+# use_cache the matrix comes from the memory-mapped cache file in cache_dir.
+# Word lists whose matrix would take more than max_matrix_bytes get a
+# FeedbackKernel.
+def load_feedback_table(word_list, use_cache=True, cache_dir=None, max_matrix_bytes=None):
+    key = word_list_hash(word_list)
+    if key not in _tables:
+        max_matrix_bytes = MAX_MATRIX_BYTES if max_matrix_bytes is None else max_matrix_bytes
+        if len(word_list) * num_answers(word_list) > max_matrix_bytes:
+            matrix = FeedbackKernel(*encode_dictionary(word_list), num_answers(word_list))
+        elif use_cache:
+            # a plain ndarray view of the memory map skips np.memmap's
+            # per-indexing overhead
+            matrix = np.asarray(load_cached_matrix(word_list, cache_dir))
+        else:
+            matrix = build_feedback_matrix(word_list)
+        _tables[key] = (index_words(word_list), matrix)
+    return _tables[key]
+
+
+# byte offsets of the letters and masks in a shared dictionary segment (the
+# n x answers feedback matrix comes first unless the table is a
+# FeedbackKernel) and the total segment size
+def _dictionary_layout(n, answers, with_matrix=True):
+    letters_offset = n * answers if with_matrix else 0
+    masks_offset = -(-(letters_offset + n * 5) // 8) * 8
+    return letters_offset, masks_offset, masks_offset + n * 4
+
+
+# (feedback table, letters, masks) over a shared dictionary segment
+def _dictionary_views(buffer, n, answers, with_matrix=True):
+    letters_offset, masks_offset, _ = _dictionary_layout(n, answers, with_matrix)
+    letters = np.ndarray((n, 5), dtype=np.uint8, buffer=buffer, offset=letters_offset)
+    masks = np.ndarray((n,), dtype=np.uint32, buffer=buffer, offset=masks_offset)
+    if with_matrix:
+        matrix = np.ndarray((n, answers), dtype=np.uint8, buffer=buffer)
+    else:
+        matrix = FeedbackKernel(letters, masks, answers)
+    return matrix, letters, masks
+
+
+# the feedback matrix and letter encoding of word_list copied once into a
+# shared memory segment; worker processes started with dictionary_pool attach
+# to it without copying or rebuilding anything. Use as a context manager so
+# the segment is removed afterwards.
+class SharedDictionary:
+    def __init__(self, word_list, use_cache=True, cache_dir=None):
+        _, matrix = load_feedback_table(word_list, use_cache, cache_dir)
+        letters, masks = encode_dictionary(word_list)
+        n, answers = len(word_list), num_answers(word_list)
+        with_matrix = not isinstance(matrix, FeedbackKernel)
+        self.segment = shared_memory.SharedMemory(create=True, size=_dictionary_layout(n, answers, with_matrix)[2])
+        shared_matrix, shared_letters, shared_masks = _dictionary_views(self.segment.buf, n, answers, with_matrix)
+        if with_matrix:
+            shared_matrix[:] = matrix
+        shared_letters[:] = letters
+        shared_masks[:] = masks
+        self.word_list = word_list
+        self.handle = (self.segment.name, word_list_hash(word_list), with_matrix)
+
+    def close(self):
+        self.segment.close()
+        self.segment.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# make the shared dictionary named by handle this process's feedback table and
+# letter encoding for word_list; a no-op when they are already loaded (for
+# example inherited from a forked parent)
+def attach_dictionary(word_list, handle):
+    name, key, with_matrix = handle
+    if key in _tables and key in _encodings:
+        return
+    # pool workers share the parent's resource tracker, which unlinks the
+    # segment only if the parent never does
+    segment = shared_memory.SharedMemory(name=name)
+    _segments[name] = segment
+    matrix, letters, masks = _dictionary_views(segment.buf, len(word_list), num_answers(word_list), with_matrix)
+    _tables[key] = (index_words(word_list), matrix)
+    _encodings[key] = (letters, masks)
+
+
+# a process pool whose workers attach to shared (a SharedDictionary) on startup
+def dictionary_pool(processes, shared):
+    return multiprocessing.Pool(processes, initializer=attach_dictionary, initargs=(shared.word_list, shared.handle))
+
+
+# c * log2(c) for every count c up to n, so the entropy of a partition of n
+# targets with bucket sizes counts is log2(n) - sum(table[counts]) / n
+def plogp_table(n):
+    table = np.zeros(n + 1)
+    counts = np.arange(1, n + 1, dtype=np.float64)
+    table[1:] = counts * np.log2(counts)
+    return table
+
+
+# entropy (in bits) of the feedback partition of candidate_idx for every guess
+# in guess_idx, computed in blocks of guesses with one bincount per block
+def guess_entropies(feedback_codes, guess_idx, candidate_idx, block_elements=1 << 22):
+    guess_idx = np.asarray(guess_idx, dtype=np.intp)
+    candidate_idx = np.asarray(candidate_idx, dtype=np.intp)
+    n = len(candidate_idx)
+    entropies = np.zeros(len(guess_idx))
+    if n == 0 or len(guess_idx) == 0:
+        return entropies
+
+    table = plogp_table(n)
+    block = min(len(guess_idx), max(1, block_elements // n))
+    offsets = (np.arange(block, dtype=np.intp) * NUM_CODES)[:, None]
+    for start in range(0, len(guess_idx), block):
+        rows = guess_idx[start:start + block]
+        if 8 * n < feedback_codes.shape[1] or isinstance(feedback_codes, FeedbackKernel):
+            # few candidates (or codes computed on demand): gather just those
+            # columns instead of whole rows
+            codes = feedback_codes[np.ix_(rows, candidate_idx)]
+        else:
+            codes = np.take(feedback_codes[rows], candidate_idx, axis=1)
+        # shift each row into its own range of 243 bins so a single bincount
+        # gives per-row counts
+        counts = np.bincount(
+            (codes + offsets[:len(rows)]).ravel(), minlength=len(rows) * NUM_CODES
+        ).reshape(len(rows), NUM_CODES)
+        # sort so guesses with the same bucket sizes get bit-identical entropies
+        counts.sort(axis=1)
+        entropies[start:start + len(rows)] = np.log2(n) - table[counts].sum(axis=1) / n
+    return entropies
+
+
+# number of sampled targets that estimates entropies to within tolerance bits:
+# the plug-in entropy of m sampled targets is low by about
+# (K - 1) / (2 m ln 2) bits when K of the 243 feedback codes occur
+def entropy_sample_size(tolerance):
+    return math.ceil((NUM_CODES - 1) / (2 * math.log(2) * tolerance))
+
+
+# approximate guess_entropies: every guess is scored against a fixed-seed
+# random sample of candidate_idx sized for tolerance, then the top_k
+# estimates are rescored exactly. Estimates that were not rescored are capped
+# just below the lowest rescored entropy, so the argmax is always an exact
+# one. Small candidate sets are scored exactly.
+def sampled_guess_entropies(feedback_codes, guess_idx, candidate_idx, tolerance, top_k=32, seed=0):
+    guess_idx = np.asarray(guess_idx, dtype=np.intp)
+    candidate_idx = np.asarray(candidate_idx, dtype=np.intp)
+    sample_size = entropy_sample_size(tolerance)
+    if sample_size >= len(candidate_idx) or top_k >= len(guess_idx):
+        return guess_entropies(feedback_codes, guess_idx, candidate_idx)
+
+    sample = np.random.default_rng(seed).choice(candidate_idx, sample_size, replace=False)
+    entropies = guess_entropies(feedback_codes, guess_idx, sample)
+    top = np.zeros(len(guess_idx), dtype=bool)
+    top[np.argsort(-entropies, kind="stable")[:top_k]] = True
+    exact = guess_entropies(feedback_codes, guess_idx[top], candidate_idx)
+    entropies[top] = exact
+    entropies[~top] = np.minimum(entropies[~top], np.nextafter(exact.min(), -np.inf))
+    return entropies
+
+
+# entropies of every guess in guess_idx against each board's candidate set
+# in boards (a list of target index arrays), as a len(boards) x
+# len(guess_idx) array. All boards share one row gather and one bincount per
+# block, and boards with the same candidates are computed once.
+def board_guess_entropies(feedback_codes, guess_idx, boards, block_elements=1 << 22):
+    guess_idx = np.asarray(guess_idx, dtype=np.intp)
+    distinct = {}
+    board_of = [
+        distinct.setdefault(np.sort(np.asarray(candidate_idx, dtype=np.intp)).tobytes(), len(distinct))
+        for candidate_idx in boards
+    ]
+    boards = [np.frombuffer(key, dtype=np.intp) for key in distinct]
+
+    entropies = np.zeros((len(boards), len(guess_idx)))
+    sizes = [len(candidate_idx) for candidate_idx in boards]
+    total = sum(sizes)
+    if total == 0 or len(guess_idx) == 0:
+        return entropies[board_of]
+
+    tables = [plogp_table(n) for n in sizes]
+    block = min(len(guess_idx), max(1, block_elements // total))
+    offsets = (np.arange(len(boards) * block, dtype=np.intp) * NUM_CODES).reshape(len(boards), block, 1)
+    for start in range(0, len(guess_idx), block):
+        if isinstance(feedback_codes, FeedbackKernel):
+            # computed on demand: only the candidate columns of each board
+            rows = guess_idx[start:start + block]
+            board_codes = [feedback_codes.block(rows, candidate_idx) for candidate_idx in boards]
+        else:
+            rows = feedback_codes[guess_idx[start:start + block]]
+            board_codes = [np.take(rows, candidate_idx, axis=1) for candidate_idx in boards]
+        # each (board, row) pair gets its own range of 243 bins
+        binned = [(codes + offsets[b, :len(rows)]).ravel() for b, codes in enumerate(board_codes)]
+        counts = np.bincount(
+            np.concatenate(binned), minlength=len(boards) * block * NUM_CODES
+        ).reshape(len(boards), block, NUM_CODES)[:, :len(rows)]
+        for b, n in enumerate(sizes):
+            if n == 0:
+                continue
+            # sort so guesses with the same bucket sizes get bit-identical entropies
+            board_counts = np.sort(counts[b], axis=1)
+            entropies[b, start:start + len(rows)] = np.log2(n) - tables[b][board_counts].sum(axis=1) / n
+    return entropies[board_of]
+
+
+# per-board and joint entropies of every guess in guess_idx against the
+# left and right candidate sets (see board_guess_entropies). The two targets
+# are independent, so the joint (left code, right code) partition is the
+# product of the per-board ones and its entropy is their sum.
+def joint_guess_entropies(feedback_codes, guess_idx, left_idx, right_idx, block_elements=1 << 22):
+    left, right = board_guess_entropies(feedback_codes, guess_idx, [left_idx, right_idx], block_elements)
+    return left, right, left + right
+
+
+# keep the candidate target indices whose feedback for guess_idx equals code,
+# i.e. the targets still consistent with that observation
+def filter_candidates(feedback_codes, candidate_idx, guess_idx, code):
+    candidate_idx = np.asarray(candidate_idx, dtype=np.intp)
+    return candidate_idx[feedback_codes[guess_idx, candidate_idx] == code]
@@ -0,0 +1,227 @@
+"""Micro-benchmarks of the solver kernels with a stored baseline.
+
+Usage: python microbench.py [--kernels K ...] [--sizes N ...] [--repeat R]
+                            [--baseline FILE] [--save-baseline] [--threshold T]
+
+Every kernel is timed on fixed, seeded inputs at several candidate-set sizes.
+A timing is the best per-call time over at least repeat measurements, each
+a batch of calls lasting MIN_MEASUREMENT seconds or more with the garbage
+collector off and the inputs built outside the timed loop. With
+--save-baseline the timings are written to the baseline file; otherwise they
+are compared with it and the run exits with status 1 if any kernel is slower
+than its baseline by more than the threshold (0.25 = 25%).
+"""
+
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+import baseline
+import dordle_entropy
+import dordle_csp_hybrid
+import verbosity
+from feedback import load_feedback_table, load_word_lists, word_list_hash
+from solver import get_vector_feedback
+
+DEFAULT_SIZES = [64, 512, 4096]
+DEFAULT_BASELINE = "microbench_baseline.json"
+
+# fast kernels are called in batches lasting at least this many seconds
+MIN_MEASUREMENT = 0.01
+
+# guesses of the seeded game history the scoring kernels are given
+HISTORY = ["tares", "plonk", "gridy"]
+
+
+# (guesses, feedback vectors) of HISTORY against a seeded target
+def history(word_list, seed):
+    target = random.Random(seed).choice(word_list)
+    guesses = [guess for guess in HISTORY if guess in word_list]
+    return guesses, [get_vector_feedback(guess, target) for guess in guesses]
+
+
+# n seeded word indices (every word if n is larger than the list)
+def sample_indices(word_list, n, seed):
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(len(word_list), min(n, len(word_list)), replace=False))
+
+
+# each kernel builder returns (setup, run) for one size: setup() builds fresh
+# arguments and run(*arguments) is the timed call
+def bench_get_vector_feedback(word_list, n, seed):
+    rng = random.Random(seed)
+    pairs = [(rng.choice(word_list), rng.choice(word_list)) for _ in range(n)]
+
+    def run(pairs):
+        for guess, target in pairs:
+            get_vector_feedback(guess, target)
+    return lambda: (pairs,), run
+
+
+def bench_score_word_list(word_list, n, seed):
+    words = [word_list[i] for i in sample_indices(word_list, n, seed)]
+    guesses, feedback = history(word_list, seed)
+    return lambda: (words, guesses, feedback), dordle_csp_hybrid.score_word_list
+
+
+def bench_calc_entropy(word_list, n, seed):
+    guesses, feedback = history(word_list, seed)
+    word_score = dordle_csp_hybrid.score_word_list(word_list, guesses, feedback)
+    candidates = sample_indices(word_list, n, seed)
+    return lambda: (guesses, word_score, word_list, candidates), dordle_csp_hybrid.calc_entropy
+
+
+def _board(word_list, n, seed):
+    board = dordle_entropy.BoardState(word_list)
+    board.candidates[:] = False
+    board.candidates[sample_indices(word_list, n, seed)] = True
+    return board
+
+
+def bench_make_guess(word_list, n, seed):
+    return lambda: (set(), _board(word_list, n, seed), word_list, False, False), dordle_entropy.make_guess
+
+
+def bench_update(word_list, n, seed):
+    guesses, feedback = history(word_list, seed)
+    return lambda: (guesses[0], feedback[0], set(), _board(word_list, n, seed), word_list), dordle_entropy.update
+
+
+def bench_check_word_against_knowledge(word_list, n, seed):
+    words = [word_list[i] for i in sample_indices(word_list, n, seed)]
+    knowledge = {i: list("abcdefghijklmnopqrstuvwxyz") for i in range(5)}
+    guesses, feedback = history(word_list, seed)
+    for guess, vector in zip(guesses, feedback):
+        knowledge = baseline.update_knowledge(knowledge, vector, guess)
+
+    def run(words, knowledge):
+        for word in words:
+            baseline.check_word_against_knowledge(word, knowledge)
+    return lambda: (words, knowledge), run
+
+
+KERNELS = {
+    "get_vector_feedback": bench_get_vector_feedback,
+    "score_word_list": bench_score_word_list,
+    "calc_entropy": bench_calc_entropy,
+    "dordle_entropy.make_guess": bench_make_guess,
+    "dordle_entropy.update": bench_update,
+    "check_word_against_knowledge": bench_check_word_against_knowledge,
+}
+
+
+# seconds per call of number calls, each on freshly set up arguments
+def measure(setup, run, number):
+    arguments = [setup() for _ in range(number)]
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for call in arguments:
+            run(*call)
+        return (time.perf_counter() - start) / number
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# best seconds per call over repeat measurements of batches sized to last
+# at least min_measurement seconds
+def time_kernel(setup, run, repeat, min_measurement=MIN_MEASUREMENT):
+    first = measure(setup, run, 1)
+    number = max(1, math.ceil(min_measurement / max(first, 1e-9)))
+    return min(measure(setup, run, number) for _ in range(repeat))
+
+
+# {"kernel@size": seconds} for every kernel and size
+def run_benchmarks(word_list, kernels, sizes, repeat=5, seed=0):
+    # build (or open) the feedback matrix before anything is timed
+    load_feedback_table(word_list)
+    timings = {}
+    with verbosity.verbose(False):
+        for kernel in kernels:
+            for n in sizes:
+                setup, run = KERNELS[kernel](word_list, n, seed)
+                timings[f"{kernel}@{n}"] = time_kernel(setup, run, repeat)
+    return timings
+
+
+# (key, baseline seconds, seconds, ratio) for every timing slower than its
+# baseline by more than threshold
+def regressions(timings, baseline_timings, threshold):
+    slower = []
+    for key, seconds in timings.items():
+        if key in baseline_timings and seconds > baseline_timings[key] * (1 + threshold):
+            slower.append((key, baseline_timings[key], seconds, seconds / baseline_timings[key]))
+    return slower
+
+
+def save_baseline(path, timings, word_list):
+    record = {
+        "word_list_hash": word_list_hash(word_list),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "timings": timings,
+    }
+    with open(path, "w") as file:
+        json.dump(record, file, indent=2)
+
+
+def load_baseline(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the solver kernels against a stored baseline.")
+    parser.add_argument("--kernels", nargs="+", default=list(KERNELS), choices=list(KERNELS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the timings as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words)
+    timings = run_benchmarks(word_list, args.kernels, args.sizes, args.repeat, args.seed)
+
+    baseline_timings = {}
+    if not args.save_baseline:
+        try:
+            stored = load_baseline(args.baseline)
+        except OSError:
+            print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        else:
+            if stored["word_list_hash"] != word_list_hash(word_list):
+                sys.exit(f"{args.baseline} was recorded for a different word list")
+            baseline_timings = stored["timings"]
+
+    for key, seconds in timings.items():
+        line = f"{key}: {seconds * 1000:.3f} ms"
+        if key in baseline_timings:
+            line += f" (baseline {baseline_timings[key] * 1000:.3f} ms, x{seconds / baseline_timings[key]:.2f})"
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, timings, word_list)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    slower = regressions(timings, baseline_timings, args.threshold)
+    for key, before, after, ratio in slower:
+        print(f"REGRESSION {key}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms (x{ratio:.2f})")
+    if slower:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""K-board variants of the game (Dordle, Quordle, Octordle) on one vectorized board state.
+
+Usage: python multi_board.py [--boards K] [--games N] [--seed S]
+                             [--processes P] [--answers FILE]
+
+The remaining targets of all boards are kept as the rows of one K x answers
+boolean mask. A guess's feedback codes for every board come from a single
+lookup in the feedback matrix and are applied to all unsolved boards in one
+step. Guesses are chosen among the words still possible on some unsolved
+board by the total entropy of their feedback over the unsolved boards (the
+targets are independent, so this is the entropy of the joint feedback); a
+board down to one candidate is finished first.
+"""
+
+import argparse
+import functools
+import os
+
+import numpy as np
+
+import verbosity
+from feedback import (
+    SOLVED_CODE, board_guess_entropies, decode_feedback, load_feedback_table, load_word_lists, num_answers,
+    word_list_hash,
+)
+from simulate import game_chunks, play_chunk, run_chunks, summarize
+from solver import get_colored_feedback
+
+# Quordle and Octordle are 4 and 8 boards
+DEFAULT_BOARDS = 4
+
+# first guesses already computed in this process, keyed by word list hash and
+# number of boards
+_openers = {}
+
+
+# plays all K boards at once: suggest() returns the next guess and
+# observe(guess, codes) reports the feedback code of every board (a solved
+# board keeps reporting SOLVED_CODE)
+class MultiBoardSolver:
+    def __init__(self, word_list, num_boards=DEFAULT_BOARDS):
+        self.word_list = word_list
+        self.num_boards = num_boards
+        self.word_index, self.feedback_codes = load_feedback_table(word_list)
+        self.reset()
+
+    def reset(self):
+        self.candidates = np.ones((self.num_boards, num_answers(self.word_list)), dtype=bool)
+        self.solved = np.zeros(self.num_boards, dtype=bool)
+        self.guessed = np.zeros(len(self.word_list), dtype=bool)
+
+    def suggest(self):
+        # every game starts in the same state, so the opener is computed once
+        if not self.guessed.any():
+            key = (word_list_hash(self.word_list), self.num_boards)
+            if key not in _openers:
+                _openers[key] = self.best_guess()
+            return _openers[key]
+        return self.best_guess()
+
+    def best_guess(self):
+        live = self.candidates[~self.solved]
+        sizes = live.sum(axis=1)
+        if (sizes == 1).any():
+            return self.word_list[int(np.argmax(live[int(np.argmax(sizes == 1))]))]
+
+        # words still possible on some board; argmax keeps the first best guess
+        guess_idx = np.flatnonzero(live.any(axis=0) & ~self.guessed[:live.shape[1]])
+        if len(guess_idx) == 0:
+            return None
+        boards = [np.flatnonzero(row) for row in live]
+        entropies = board_guess_entropies(self.feedback_codes, guess_idx, boards).sum(axis=0)
+        return self.word_list[guess_idx[int(np.argmax(entropies))]]
+
+    def observe(self, guess, codes):
+        guess_index = self.word_index[guess]
+        codes = np.asarray(codes)
+        self.guessed[guess_index] = True
+        # keep the targets of every unsolved board that give its observed code
+        live = ~self.solved
+        self.candidates[live] &= self.feedback_codes[guess_index] == codes[live, None]
+        self.solved |= codes == SOLVED_CODE
+        self.candidates[self.solved] = False
+
+
+# play one game of len(target_words) boards; returns the number of attempts
+# used (attempts if the game was not finished)
+def play_multi_game(solver, target_words, attempts=100):
+    word_index, feedback_codes = load_feedback_table(solver.word_list)
+    target_idx = np.array([word_index[word] for word in target_words])
+    solved = np.zeros(len(target_words), dtype=bool)
+    solver.reset()
+
+    for attempt in range(1, attempts + 1):
+        guess = solver.suggest()
+        if guess is None or guess not in word_index:
+            raise ValueError(f"invalid guess {guess!r} from {type(solver).__name__}")
+
+        # feedback for every board in one lookup; solved boards stay solved
+        codes = feedback_codes[word_index[guess], target_idx].astype(np.intp)
+        codes[solved] = SOLVED_CODE
+        solved |= codes == SOLVED_CODE
+
+        if verbosity.VERBOSE:
+            print(f"Attempt {attempt}/{attempts}, guess is: {guess}")
+            print(" | ".join(
+                get_colored_feedback(target if done else guess, target) for target, done in zip(target_words, solved)
+            ), "--> codes:", [decode_feedback(code) for code in codes.tolist()])
+
+        if solved.all():
+            if verbosity.VERBOSE:
+                print(f"Congratulations! You guessed all {len(target_words)} words, in {attempt} attempts!\n")
+            return attempt
+        solver.observe(guess, codes)
+
+    if verbosity.VERBOSE:
+        print("Game over! Better luck next time.")
+        print(f"The words were: {target_words}\n")
+    return attempts
+
+
+# play a chunk of games in the current process; returns one
+# (game_num, target_words, attempts, seconds) record per game
+def play_games(word_list, num_boards, seed, game_nums):
+    game = functools.partial(play_multi_game, MultiBoardSolver(word_list, num_boards))
+    return play_chunk(game, word_list, seed, game_nums, num_boards)
+
+
+# play games 1..total_games across a process pool (see simulate.run_chunks)
+def run_simulation(word_list, num_boards, total_games, seed=0, processes=None):
+    processes = processes or os.cpu_count() or 1
+    jobs = [(word_list, num_boards, seed, chunk) for chunk in game_chunks(total_games, processes)]
+    chunk_results, wall_time = run_chunks(play_games, jobs, word_list, processes)
+    results = sorted(record for records in chunk_results for record in records)
+    return results, summarize(results, wall_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate K-board games (Quordle, Octordle, ...).")
+    parser.add_argument("--boards", type=int, default=DEFAULT_BOARDS)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", default=None, help="file of possible targets (default: every word)")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words, args.answers)
+    _, summary = run_simulation(word_list, args.boards, args.games, args.seed, args.processes)
+
+    print("total games", summary["total_games"])
+    print(f"average attemps per game: {summary['average']}")
+    print(f"guess distribution: {summary['guess_distribution']}")
+    print("total game time: ", summary["game_time"], "seconds")
+    print("total time: ", summary["wall_time"], "seconds")
+
+
+if __name__ == "__main__":
+    main()
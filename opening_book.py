@@ -0,0 +1,107 @@
+"""Precomputed second guesses after the fixed "tares" opener.
+
+Usage: python opening_book.py <strategy> [<strategy> ...] [--processes P]
+
+For every reachable (left feedback, right feedback) pair after the opener the
+builder asks the strategy's solver for its second guess and stores the word
+index in a 243 x 243 int32 table (-1 for pairs that cannot occur). Solvers
+given the table skip the turn-two computation entirely.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+import verbosity
+from feedback import (
+    CACHE_DIR, NUM_CODES, SharedDictionary, decode_feedback, dictionary_pool, load_feedback_table, load_word_lists,
+    word_list_hash,
+)
+from solver import make_solver, opening_book_strategies
+
+OPENER = "tares"
+
+
+def book_path(strategy, word_list, cache_dir=None):
+    return os.path.join(
+        cache_dir or CACHE_DIR, f"opening_book_{strategy}_{word_list_hash(word_list)[:32]}.npy"
+    )
+
+
+# feedback codes the opener can receive from some answer in word_list
+def reachable_codes(word_list, opener=OPENER):
+    word_index, feedback_codes = load_feedback_table(word_list)
+    return np.unique(feedback_codes[word_index[opener]])
+
+
+# second guesses for every (left code, right code) pair in pairs
+def second_guesses(strategy, word_list, pairs):
+    solver = make_solver(strategy, word_list)
+    word_index, _ = load_feedback_table(word_list)
+    guesses = []
+    with verbosity.verbose(False):
+        for left_code, right_code in pairs:
+            solver.reset()
+            solver.observe(OPENER, decode_feedback(left_code), decode_feedback(right_code))
+            guesses.append(word_index[solver.suggest()])
+    return guesses
+
+
+def _second_guesses(args):
+    return second_guesses(*args)
+
+
+def build_opening_book(strategy, word_list, processes=None):
+    codes = [int(code) for code in reachable_codes(word_list)]
+    rows = [[(left_code, right_code) for right_code in codes] for left_code in codes]
+
+    # build (or open) the feedback matrix once so workers find it cached
+    load_feedback_table(word_list)
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        results = [second_guesses(strategy, word_list, row) for row in rows]
+    else:
+        with SharedDictionary(word_list) as shared, dictionary_pool(processes, shared) as pool:
+            results = pool.map(_second_guesses, [(strategy, word_list, row) for row in rows])
+
+    table = np.full((NUM_CODES, NUM_CODES), -1, dtype=np.int32)
+    for row, guesses in zip(rows, results):
+        for (left_code, right_code), guess in zip(row, guesses):
+            table[left_code, right_code] = guess
+    return table
+
+
+def save_opening_book(table, strategy, word_list, cache_dir=None):
+    path = book_path(strategy, word_list, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, table)
+    return path
+
+
+# the stored table for strategy, or None if it has not been built
+def load_opening_book(strategy, word_list, cache_dir=None):
+    try:
+        return np.load(book_path(strategy, word_list, cache_dir))
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build second-guess opening books.")
+    parser.add_argument("strategies", nargs="+", choices=opening_book_strategies())
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", default=None, help="file of possible targets (default: every word)")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words, args.answers)
+    for strategy in args.strategies:
+        table = build_opening_book(strategy, word_list, args.processes)
+        path = save_opening_book(table, strategy, word_list)
+        print(f"{strategy}: {np.count_nonzero(table >= 0)} second guesses written to {path}")
+
+
+if __name__ == "__main__":
+    main()
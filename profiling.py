@@ -0,0 +1,309 @@
+"""Opt-in per-turn profiling of the solvers and game loops.
+
+enable() swaps timing wrappers into the modules for the functions listed in
+PHASES; nothing is wrapped until then, so runs without profiling execute
+exactly the original code. Each turn (from one outermost suggest() call to
+the next) records the wall time and call count of every phase, the number of
+feedback codes evaluated and the largest candidate set scored. summary()
+turns the records into percentiles per phase and turn time by candidate
+count, and write_summary() saves it as JSON. Phases nest: suggest includes
+the entropy and scoring work done inside it, and a phase called from itself
+is only timed at the outermost call.
+
+Set DORDLE_PROFILE=FILE to profile a script's main() run into FILE.
+"""
+
+import builtins
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# phase -> "module:function" or "module:Class.method" targets timed as that
+# phase; every module binding of a wrapped function is replaced
+PHASES = {
+    "suggest": [
+        "baseline:BaselineSolver.suggest",
+        "dordle_entropy:EntropySolver.suggest",
+        "csp_scoring:CSPSolver.suggest",
+        "state_cache:CachedSolver.suggest",
+        "decision_tree:TreeSolver.suggest",
+        "multi_board:MultiBoardSolver.suggest",
+    ],
+    "observe": [
+        "baseline:BaselineSolver.observe",
+        "dordle_entropy:EntropySolver.observe",
+        "csp_scoring:CSPSolver.observe",
+        "balanced2_dordle:Balanced2Solver.observe",
+        "state_cache:CachedSolver.observe",
+        "decision_tree:TreeSolver.observe",
+        "multi_board:MultiBoardSolver.observe",
+    ],
+    "score_word_list": [
+        "dordle_csp_hybrid:score_word_list",
+        "balanced_dordle:score_word_list",
+        "balanced2_dordle:score_word_list",
+        "csp_scoring:score_words",
+        "csp_scoring:IncrementalScorer.add",
+    ],
+    "calc_entropy": [
+        "dordle_csp_hybrid:calc_entropy",
+        "balanced_dordle:calc_entropy",
+        "balanced2_dordle:calc_entropy",
+        "balanced2_dordle:calc_board_entropies",
+        "csp_scoring:select_guess",
+        "balanced2_dordle:Balanced2Solver.select_joint_guess",
+        "dordle_entropy:make_guess",
+        "multi_board:MultiBoardSolver.best_guess",
+        "baseline:guess_word",
+    ],
+    "entropy_kernel": [
+        "feedback:guess_entropies",
+        "feedback:board_guess_entropies",
+    ],
+    "update": [
+        "dordle_entropy:update",
+        "baseline:update_knowledge",
+        "feedback:filter_candidates",
+    ],
+    "feedback": [
+        "solver:get_vector_feedback",
+        "solver:get_colored_feedback",
+    ],
+}
+
+# modules whose print() calls are timed as the "print" phase
+PRINT_MODULES = [
+    "solver", "baseline", "dordle_entropy", "dordle_csp_hybrid", "balanced_dordle", "balanced2_dordle",
+    "csp_scoring", "multi_board",
+]
+
+# modules searched for bindings of the wrapped functions
+MODULES = sorted({target.split(":")[0] for targets in PHASES.values() for target in targets} | set(PRINT_MODULES))
+
+
+# (feedback codes evaluated, candidate set size) of one call, for the
+# functions that evaluate feedback
+def _guess_entropies_work(feedback_codes, guess_idx, candidate_idx, *args, **kwargs):
+    return len(guess_idx) * len(candidate_idx), len(candidate_idx)
+
+
+def _board_entropies_work(feedback_codes, guess_idx, boards, *args, **kwargs):
+    sizes = [len(candidate_idx) for candidate_idx in boards]
+    return len(guess_idx) * sum(sizes), max(sizes, default=0)
+
+
+def _filter_work(feedback_codes, candidate_idx, *args, **kwargs):
+    return len(candidate_idx), 0
+
+
+def _vector_feedback_work(*args, **kwargs):
+    return 1, 0
+
+
+def _guess_word_work(possible_words, *args, **kwargs):
+    return len(possible_words), len(possible_words)
+
+
+WORK = {
+    "feedback:guess_entropies": _guess_entropies_work,
+    "feedback:board_guess_entropies": _board_entropies_work,
+    "feedback:filter_candidates": _filter_work,
+    "solver:get_vector_feedback": _vector_feedback_work,
+    "baseline:guess_word": _guess_word_work,
+}
+
+# finished and current turn records; a record is {"phases": {phase:
+# [seconds, calls]}, "feedback_evaluations": int, "candidates": int}
+_turns = []
+_current = None
+
+# nesting depth per phase, so recursive and overriding calls are timed once
+_depth = {}
+
+# (owner, attribute, original) for every patched binding, to undo enable()
+_patches = []
+
+
+def enabled():
+    return bool(_patches)
+
+
+def _turn():
+    global _current
+    if _current is None:
+        _current = {"phases": {}, "feedback_evaluations": 0, "candidates": 0}
+        _turns.append(_current)
+    return _current
+
+
+def _wrap(phase, function, work=None):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        global _current
+        if phase == "suggest" and not _depth.get(phase):
+            _current = None
+        turn = _turn()
+        if work is not None:
+            evaluations, candidates = work(*args, **kwargs)
+            turn["feedback_evaluations"] += evaluations
+            turn["candidates"] = max(turn["candidates"], candidates)
+        if _depth.get(phase):
+            return function(*args, **kwargs)
+        _depth[phase] = 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _depth[phase] = 0
+            totals = turn["phases"].setdefault(phase, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+    return wrapper
+
+
+# marks bindings that did not exist before enable() (print in a module)
+_MISSING = object()
+
+
+def _patch(owner, name, value):
+    _patches.append((owner, name, owner.__dict__.get(name, _MISSING)))
+    setattr(owner, name, value)
+
+
+# wrap every function in PHASES (and print in PRINT_MODULES); modules that
+# are not importable are skipped
+def enable():
+    if enabled():
+        return
+    modules = {}
+    for name in MODULES:
+        try:
+            modules[name] = importlib.import_module(name)
+        except ImportError:
+            continue
+    # a script run directly (python dordle_entropy.py) plays with the
+    # functions of __main__, not of its imported copy
+    main = sys.modules.get("__main__")
+    main_name = os.path.splitext(os.path.basename(getattr(main, "__file__", "") or ""))[0]
+    if getattr(main, "__spec__", None) is None and main_name in modules:
+        modules["__main__"] = main
+
+    wrappers = {}
+    for phase, targets in PHASES.items():
+        for target in targets:
+            module_name, qualname = target.split(":")
+            owners = [modules[name] for name in (module_name, "__main__") if name in modules]
+            if module_name != main_name:
+                owners = owners[:1]
+            for owner in owners:
+                *classes, attribute = qualname.split(".")
+                for class_name in classes:
+                    owner = getattr(owner, class_name)
+                original = owner.__dict__[attribute]
+                wrapper = _wrap(phase, original, WORK.get(target))
+                if classes:
+                    _patch(owner, attribute, wrapper)
+                else:
+                    wrappers[id(original)] = (original, wrapper)
+
+    # rebind module-level functions everywhere they were imported
+    for module in modules.values():
+        for attribute, value in list(vars(module).items()):
+            if id(value) in wrappers and wrappers[id(value)][0] is value:
+                _patch(module, attribute, wrappers[id(value)][1])
+
+    timed_print = _wrap("print", builtins.print)
+    for name in PRINT_MODULES + ["__main__"]:
+        if name in modules:
+            _patch(modules[name], "print", timed_print)
+
+
+# restore every binding replaced by enable()
+def disable():
+    global _current
+    while _patches:
+        owner, name, original = _patches.pop()
+        if original is _MISSING:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+    _current = None
+
+
+# the turn records so far, clearing them (workers send these to the parent)
+def collect():
+    global _current
+    turns = list(_turns)
+    _turns.clear()
+    _current = None
+    return turns
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    values = np.asarray(values, dtype=np.float64)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "mean": float(values.mean()), "p50": float(p50), "p90": float(p90), "p99": float(p99),
+        "max": float(values.max()),
+    }
+
+
+# per-phase totals and per-turn percentiles, feedback evaluations, candidate
+# set sizes and mean turn time (suggest + observe) by candidate count,
+# bucketed by powers of two
+def summary(turns=None):
+    turns = _turns if turns is None else turns
+    phases = sorted({phase for turn in turns for phase in turn["phases"]})
+    result = {"turns": len(turns), "phases": {}}
+    for phase in phases:
+        records = [turn["phases"].get(phase, (0.0, 0)) for turn in turns]
+        result["phases"][phase] = {
+            "seconds": sum(seconds for seconds, _ in records),
+            "calls": sum(calls for _, calls in records),
+            "seconds_per_turn": _percentiles([seconds for seconds, _ in records]),
+            "calls_per_turn": _percentiles([calls for _, calls in records]),
+        }
+
+    evaluations = [turn["feedback_evaluations"] for turn in turns]
+    result["feedback_evaluations"] = {"total": sum(evaluations), "per_turn": _percentiles(evaluations)}
+    result["candidates"] = _percentiles([turn["candidates"] for turn in turns])
+
+    buckets = {}
+    for turn in turns:
+        seconds = sum(turn["phases"].get(phase, (0.0, 0))[0] for phase in ("suggest", "observe"))
+        buckets.setdefault(int(turn["candidates"]).bit_length(), []).append(seconds)
+    result["time_vs_candidates"] = [
+        {
+            "candidates_min": 0 if bits == 0 else 1 << (bits - 1),
+            "candidates_max": (1 << bits) - 1,
+            "turns": len(seconds),
+            "seconds": _percentiles(seconds),
+        }
+        for bits, seconds in sorted(buckets.items())
+    ]
+    return result
+
+
+def write_summary(path, turns=None):
+    with open(path, "w") as file:
+        json.dump(summary(turns), file, indent=2)
+
+
+# for scripts: enable profiling when DORDLE_PROFILE names an output file
+def enable_from_env():
+    if os.environ.get("DORDLE_PROFILE"):
+        enable()
+
+
+# for scripts: write the summary to DORDLE_PROFILE if profiling was enabled
+def finish():
+    if enabled() and os.environ.get("DORDLE_PROFILE"):
+        write_summary(os.environ["DORDLE_PROFILE"])
@@ -0,0 +1,197 @@
+"""Parallel simulation harness for all strategies.
+
+Usage: python simulate.py <strategy> [--games N] [--seed S] [--processes P]
+                           [--answers FILE] [--opening-book] [--state-cache MB]
+                           [--persist-state-cache] [--profile FILE]
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+import time
+
+import profiling
+import verbosity
+from feedback import SharedDictionary, answer_words, dictionary_pool, load_feedback_table, load_word_lists
+from opening_book import load_opening_book
+from solver import STRATEGIES, make_solver, play_game, solver_class
+from state_cache import CachedSolver, shared_cache
+
+
+# the target words of a game (drawn from the answers, two for Dordle) depend
+# only on the run seed and the game number, so any split of games across
+# workers plays the same games
+def game_targets(word_list, seed, game_num, num_boards=2):
+    return random.Random(f"{seed}:{game_num}").sample(answer_words(word_list), num_boards)
+
+
+# play game_nums in the current process, game(target_words) playing one game
+# and returning its attempts; returns one (game_num, target_words, attempts,
+# seconds) record per game
+def play_chunk(game, word_list, seed, game_nums, num_boards=2):
+    results = []
+    with verbosity.verbose(False):
+        for game_num in game_nums:
+            target_words = game_targets(word_list, seed, game_num, num_boards)
+            start = time.perf_counter()
+            attempts = game(target_words)
+            results.append((game_num, target_words, attempts, time.perf_counter() - start))
+    return results
+
+
+# play a chunk of games in the current process; returns one
+# (game_num, target_words, attempts, seconds) record per game, the state
+# cache hits and misses of the chunk and (with profile) its profiling turn
+# records. With state_cache_mb the solver's decisions go through this
+# process's LRU state cache of that size. opening_book is ignored for
+# solvers that do not support one.
+def play_games(
+    strategy, word_list, seed, game_nums, opening_book=False, state_cache_mb=0, persist_state_cache=False,
+    profile=False,
+):
+    # profiling started here is stopped again once the turns are collected,
+    # so later chunks in this process run the unwrapped functions
+    start_profiling = profile and not profiling.enabled()
+    if start_profiling:
+        profiling.enable()
+    try:
+        options = {}
+        if opening_book and solver_class(strategy).supports_opening_book:
+            options["opening_book"] = load_opening_book(strategy, word_list)
+            if options["opening_book"] is None:
+                raise ValueError(f"no opening book for {strategy}; run python opening_book.py {strategy}")
+        solver = make_solver(strategy, word_list, **options)
+        cache = None
+        if state_cache_mb:
+            cache = shared_cache(
+                strategy, word_list, state_cache_mb << 20, persist_state_cache, settings=solver.settings()
+            )
+            hits, misses = cache.hits, cache.misses
+            solver = CachedSolver(solver, cache)
+        results = play_chunk(functools.partial(play_game, solver), word_list, seed, game_nums)
+        turns = profiling.collect() if profile else []
+    finally:
+        if start_profiling:
+            profiling.disable()
+    if cache is None:
+        return results, (0, 0), turns
+    if persist_state_cache:
+        cache.save()
+    return results, (cache.hits - hits, cache.misses - misses), turns
+
+
+# games 1..total_games split into chunks, by default about four per process
+def game_chunks(total_games, processes, chunk_size=None):
+    game_nums = list(range(1, total_games + 1))
+    chunk_size = chunk_size or max(1, total_games // (processes * 4))
+    return [game_nums[i:i + chunk_size] for i in range(0, total_games, chunk_size)]
+
+
+def _run_job(args):
+    chunk, job = args
+    return chunk(*job)
+
+
+# chunk(*job) for every job across a process pool whose workers attach to one
+# shared copy of the feedback matrix; with processes=1 the jobs run serially
+# in this process. chunk must be a module-level function so workers can load
+# it. Returns the results in completion order and the wall time.
+def run_chunks(chunk, jobs, word_list, processes):
+    # build (or open) the feedback matrix once so workers find it cached
+    load_feedback_table(word_list)
+
+    start = time.perf_counter()
+    if processes == 1:
+        chunk_results = [chunk(*job) for job in jobs]
+    else:
+        with SharedDictionary(word_list) as shared, dictionary_pool(processes, shared) as pool:
+            chunk_results = list(pool.imap_unordered(_run_job, [(chunk, job) for job in jobs]))
+    return chunk_results, time.perf_counter() - start
+
+
+# merge per-game records into the summary that main() prints
+def summarize(results, wall_time, cache_counts=(0, 0)):
+    guess_distribution = {}
+    for _, _, attempts, _ in results:
+        guess_distribution[attempts] = guess_distribution.get(attempts, 0) + 1
+    total_games = len(results)
+    return {
+        "total_games": total_games,
+        "average": sum(attempts for _, _, attempts, _ in results) / total_games if total_games else 0.0,
+        "guess_distribution": dict(sorted(guess_distribution.items())),
+        "game_time": sum(seconds for _, _, _, seconds in results),
+        "wall_time": wall_time,
+        "cache_hits": cache_counts[0],
+        "cache_misses": cache_counts[1],
+    }
+
+
+# play games 1..total_games of one strategy across a process pool; with
+# processes=1 the games run serially in this process. With profile the
+# summary includes the profiling.summary() of every turn played.
+def run_simulation(
+    strategy, word_list, total_games, seed=0, processes=None, chunk_size=None, opening_book=False,
+    state_cache_mb=0, persist_state_cache=False, profile=False,
+):
+    if opening_book and not solver_class(strategy).supports_opening_book:
+        print(f"{strategy} does not use an opening book; playing without one")
+        opening_book = False
+    processes = processes or os.cpu_count() or 1
+    jobs = [
+        (strategy, word_list, seed, chunk, opening_book, state_cache_mb, persist_state_cache, profile)
+        for chunk in game_chunks(total_games, processes, chunk_size)
+    ]
+    chunk_results, wall_time = run_chunks(play_games, jobs, word_list, processes)
+
+    results = []
+    hits = misses = 0
+    turns = []
+    for records, (chunk_hits, chunk_misses), chunk_turns in chunk_results:
+        results.extend(records)
+        hits += chunk_hits
+        misses += chunk_misses
+        turns.extend(chunk_turns)
+
+    results.sort()
+    summary = summarize(results, wall_time, (hits, misses))
+    if profile:
+        summary["profile"] = profiling.summary(turns)
+    return results, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Dordle games in parallel.")
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", default=None, help="file of possible targets (default: every word)")
+    parser.add_argument("--opening-book", action="store_true", help="use the prebuilt second-guess table")
+    parser.add_argument("--state-cache", type=int, default=0, metavar="MB", help="memoize guesses by game state")
+    parser.add_argument("--persist-state-cache", action="store_true", help="load and save the state cache on disk")
+    parser.add_argument("--profile", default=None, metavar="FILE", help="write a per-turn phase timing summary (JSON)")
+    args = parser.parse_args()
+
+    word_list = load_word_lists(args.words, args.answers)
+    _, summary = run_simulation(
+        args.strategy, word_list, args.games, args.seed, args.processes, opening_book=args.opening_book,
+        state_cache_mb=args.state_cache, persist_state_cache=args.persist_state_cache, profile=args.profile is not None,
+    )
+    if args.profile:
+        with open(args.profile, "w") as file:
+            json.dump(summary["profile"], file, indent=2)
+
+    print("total games", summary["total_games"])
+    print(f"average attemps per game: {summary['average']}")
+    print(f"guess distribution: {summary['guess_distribution']}")
+    print("total game time: ", summary["game_time"], "seconds")
+    print("total time: ", summary["wall_time"], "seconds")
+    if args.state_cache:
+        print(f"state cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Common solver protocol, game loop and strategy registry.
+
+A solver plays both boards of a Dordle game through three calls:
+reset() starts a new game, suggest() returns the next guess and
+observe(guess, feedback_left, feedback_right) reports the feedback vectors
+for that guess (a solved board keeps reporting [2, 2, 2, 2, 2]).
+"""
+
+import copy
+import importlib
+
+import verbosity
+
+# ANSI escape codes for colors
+COLORS = {
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "gray": "\033[90m",
+    "reset": "\033[0m",
+}
+
+SOLVED_FEEDBACK = [2, 2, 2, 2, 2]
+
+# strategy name -> (module, solver class, keyword arguments)
+STRATEGIES = {
+    "baseline": ("baseline", "BaselineSolver", {}),
+    "entropy": ("dordle_entropy", "EntropySolver", {}),
+    "entropy-sampled": ("dordle_entropy", "EntropySolver", {"entropy_tolerance": 0.1}),
+    "csp": ("dordle_csp_hybrid", "HybridSolver", {"entropy_weight": 0}),
+    "hybrid": ("dordle_csp_hybrid", "HybridSolver", {}),
+    "balanced1": ("balanced_dordle", "Balanced1Solver", {}),
+    "balanced2": ("balanced2_dordle", "Balanced2Solver", {}),
+    "hybrid-candidates": ("dordle_csp_hybrid", "HybridSolver", {"candidate_aware": True}),
+    "balanced1-candidates": ("balanced_dordle", "Balanced1Solver", {"candidate_aware": True}),
+    "balanced2-candidates": ("balanced2_dordle", "Balanced2Solver", {"candidate_aware": True}),
+}
+
+
+class Solver:
+    # whether the solver takes an opening_book of second guesses (opening_book.py)
+    supports_opening_book = False
+
+    def __init__(self, word_list):
+        self.word_list = word_list
+        self.reset()
+
+    def reset(self):
+        raise NotImplementedError
+
+    def suggest(self):
+        raise NotImplementedError
+
+    def observe(self, guess, feedback_left, feedback_right):
+        raise NotImplementedError
+
+    # the option values that decide this solver's guesses (state caches are
+    # keyed by them)
+    def settings(self):
+        return {"solver": type(self).__name__}
+
+    # objects that depend only on the word list and the settings, which
+    # clone() shares instead of copying
+    def shared_state(self):
+        return [self.word_list]
+
+    # an independent copy of the game played so far, for exploring another
+    # branch of it; the objects in shared_state() are shared with the copy
+    def clone(self):
+        return copy.deepcopy(self, {id(value): value for value in self.shared_state()})
+
+    # each strategy's interactive trace, printed by play_game when verbose:
+    # the line(s) announcing a guess and the end-of-game messages
+    def print_guess(self, attempt, attempts, guess):
+        pass
+
+    def print_won(self, attempt):
+        print(f"Congratulations! You guessed both words, in {attempt} attempts!\n")
+
+    def print_lost(self, target_words):
+        print("Game over! Better luck next time.")
+        print(f"The words were: {target_words}\n")
+
+
+def solver_class(strategy):
+    module_name, class_name, _ = STRATEGIES[strategy]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def make_solver(strategy, word_list, **kwargs):
+    return solver_class(strategy)(word_list, **{**STRATEGIES[strategy][2], **kwargs})
+
+
+# the strategies whose solvers can play from an opening book
+def opening_book_strategies():
+    return sorted(strategy for strategy in STRATEGIES if solver_class(strategy).supports_opening_book)
+
+
+# helper function to get vectorized feedback
+# [0] indicates "gray letter"
+# [1] indicates "yellow letter"
+# [2] indicates "green letter"
+def get_vector_feedback(guess, target):
+    feedback = []
+    for i, letter in enumerate(guess):
+        if letter == target[i]:
+            feedback.append(2)
+        elif letter in target:
+            feedback.append(1)
+        else:
+            feedback.append(0)
+    return feedback
+
+
+# helper function to get feedback and format with colors
+def get_colored_feedback(guess, target):
+    feedback = []
+    for i, letter in enumerate(guess):
+        if letter == target[i]:
+            feedback.append(COLORS["green"] + letter + COLORS["reset"])
+        elif letter in target:
+            feedback.append(COLORS["yellow"] + letter + COLORS["reset"])
+        else:
+            feedback.append(COLORS["gray"] + letter + COLORS["reset"])
+    return "".join(feedback)
+
+
+# play one game with solver against target_words; returns the number of
+# attempts used (attempts if the game was not finished)
+def play_game(solver, target_words, attempts=100):
+    solver.reset()
+    left_word_solved = False
+    right_word_solved = False
+
+    for attempt in range(1, attempts + 1):
+        guess = solver.suggest()
+        if verbosity.VERBOSE:
+            solver.print_guess(attempt, attempts, guess)
+
+        # validate guess
+        if guess is None or len(guess) != 5 or guess not in solver.word_list:
+            raise ValueError(f"invalid guess {guess!r} from {type(solver).__name__}")
+
+        # get vectorized feeback to be supplied to model
+        vector_feedback1 = list(SOLVED_FEEDBACK) if left_word_solved else get_vector_feedback(guess, target_words[0])
+        vector_feedback2 = list(SOLVED_FEEDBACK) if right_word_solved else get_vector_feedback(guess, target_words[1])
+
+        if guess == target_words[0]:
+            left_word_solved = True
+
+        if guess == target_words[1]:
+            right_word_solved = True
+
+        if verbosity.VERBOSE:
+            # display feedback for each target word with colored output
+            colored_feedback1 = get_colored_feedback(target_words[0] if left_word_solved else guess, target_words[0])
+            colored_feedback2 = get_colored_feedback(target_words[1] if right_word_solved else guess, target_words[1])
+            print(f"{colored_feedback1} | {colored_feedback2} --> vectorized feedback: {vector_feedback1} | {vector_feedback2}")
+
+        # check end game conditions
+        if left_word_solved and right_word_solved:
+            if verbosity.VERBOSE:
+                solver.print_won(attempt)
+            return attempt
+
+        solver.observe(guess, vector_feedback1, vector_feedback2)
+
+    if verbosity.VERBOSE:
+        solver.print_lost(target_words)
+    return attempts
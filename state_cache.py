@@ -0,0 +1,205 @@
+"""LRU caches of next-guess decisions keyed by the game or board state.
+
+Every solver is deterministic, so its next guess depends only on the guesses
+and feedback seen so far. CachedSolver wraps a solver and looks the guess up
+under a canonical encoding of that history before asking the solver: games
+that pass through the same state (for example the same feedback after the
+opener) reuse one computed decision. The cache is bounded by an approximate
+memory size, counts hits and misses and can be saved to disk between runs.
+
+Solvers that work one board at a time also keep a shared cache of per-board
+results keyed by that board's own history (see board_turn()), so a result is
+reused by any later game that reaches the same board state, whatever the
+other board is doing.
+"""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+from feedback import CACHE_DIR, encode_feedback, index_words, word_list_hash
+from solver import Solver
+
+# part of every cache file name, like FEEDBACK_RULE for the feedback matrix:
+# bump it when a solver's decisions change in a way its settings() do not show
+STATE_CACHE_VERSION = 1
+
+# approximate bytes held per entry beyond its key (dict slot, key and value objects)
+ENTRY_OVERHEAD = 120
+
+# caches already opened in this process, keyed by file path
+_caches = {}
+
+
+# settings are the option values of the solver whose decisions are cached,
+# so a run with other settings never replays them
+def cache_path(namespace, word_list, cache_dir=None, settings=None):
+    digest = hashlib.sha256(f"v{STATE_CACHE_VERSION}\n{word_list_hash(word_list)}".encode())
+    if settings:
+        digest.update(repr(sorted(settings.items())).encode())
+    return os.path.join(cache_dir or CACHE_DIR, f"state_cache_{namespace}_{digest.hexdigest()[:32]}.pkl")
+
+
+# maps encoded states to cached results (for CachedSolver, the index of the
+# guess chosen in that state), evicting the least recently used entries once
+# max_bytes is exceeded
+class StateCache:
+    def __init__(self, max_bytes=64 << 20, path=None, name=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.name = name
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            self.load(path)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    # nbytes is the approximate size of value when it is more than a small object
+    def put(self, key, value, nbytes=0):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.size -= self.sizes[key]
+        self.sizes[key] = len(key) + ENTRY_OVERHEAD + nbytes
+        self.size += self.sizes[key]
+        self.entries[key] = value
+        while self.size > self.max_bytes and self.entries:
+            old_key, _ = self.entries.popitem(last=False)
+            self.size -= self.sizes.pop(old_key)
+
+    # add the entries stored at path as the least recently used ones
+    def load(self, path):
+        try:
+            with open(path, "rb") as file:
+                stored = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return
+        entries, sizes = self.entries, self.sizes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.size = 0
+        for key, value in stored:
+            if key not in entries:
+                self.put(key, value)
+        for key, value in entries.items():
+            self.put(key, value, sizes[key] - len(key) - ENTRY_OVERHEAD)
+
+    # write the entries to path merged with whatever is already stored there,
+    # so processes sharing a file keep each other's decisions
+    def save(self, path=None):
+        path = path or self.path
+        self.load(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a private file and rename so concurrent runs never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(list(self.entries.items()), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries), "bytes": self.size}
+
+    # a shared cache is reopened by name when a solver holding it is copied or
+    # sent to a worker process, instead of duplicating its entries
+    def __reduce_ex__(self, protocol):
+        if self.name is None:
+            return super().__reduce_ex__(protocol)
+        return _open_shared, (self.name, self.max_bytes, self.path)
+
+
+# the process-wide cache for namespace (usually the strategy name) and
+# settings, loaded from disk on first use when persist is set
+def shared_cache(namespace, word_list, max_bytes=64 << 20, persist=False, cache_dir=None, settings=None):
+    path = cache_path(namespace, word_list, cache_dir, settings)
+    return _open_shared(path, max_bytes, path if persist else None)
+
+
+def _open_shared(name, max_bytes, path):
+    if name not in _caches:
+        _caches[name] = StateCache(max_bytes, path, name)
+    return _caches[name]
+
+
+# per-process board caches are bounded at this size unless given otherwise
+BOARD_CACHE_BYTES = 128 << 20
+
+
+# bytes used to encode a word index of word_list in a state key: 2 for
+# lists of up to 65,536 words, 4 for larger ones
+def index_width(word_list):
+    return 2 if len(word_list) <= 1 << 16 else 4
+
+
+def encode_index(index, width):
+    return index.to_bytes(width, "little")
+
+
+# encoding of one turn of a single board's history: guess index (width
+# bytes, see index_width) and code
+def board_turn(guess_index, code, width=2):
+    return encode_index(guess_index, width) + bytes([code])
+
+
+# wraps a solver so suggest() first looks up the state: the history of
+# (guess, left feedback, right feedback) encoded per turn as the guess index
+# (index_width bytes), left code and right code, followed by the two solved
+# flags. The wrapped solver still observes every turn, so a miss can always
+# be computed.
+class CachedSolver(Solver):
+    def __init__(self, solver, cache):
+        self.solver = solver
+        self.cache = cache
+        self.word_index = index_words(solver.word_list)
+        self.index_width = index_width(solver.word_list)
+        super().__init__(solver.word_list)
+
+    def reset(self):
+        self.solver.reset()
+        self.state = bytearray()
+        self.solved = [False, False]
+
+    def suggest(self):
+        key = bytes(self.state) + bytes(self.solved)
+        index = self.cache.get(key)
+        if index is not None:
+            return self.word_list[index]
+        guess = self.solver.suggest()
+        if guess is not None:
+            self.cache.put(key, self.word_index[guess])
+        return guess
+
+    def observe(self, guess, feedback_left, feedback_right):
+        self.solver.observe(guess, feedback_left, feedback_right)
+        self.state += encode_index(self.word_index[guess], self.index_width)
+        self.state.append(encode_feedback(feedback_left))
+        self.state.append(encode_feedback(feedback_right))
+        if feedback_left.count(2) == 5:
+            self.solved[0] = True
+        if feedback_right.count(2) == 5:
+            self.solved[1] = True
+
+    def shared_state(self):
+        return super().shared_state() + [self.cache, self.word_index] + self.solver.shared_state()
+
+    def settings(self):
+        return self.solver.settings()
+
+    def print_guess(self, attempt, attempts, guess):
+        self.solver.print_guess(attempt, attempts, guess)
+
+    def print_won(self, attempt):
+        self.solver.print_won(attempt)
+
+    def print_lost(self, target_words):
+        self.solver.print_lost(target_words)
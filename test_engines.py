@@ -0,0 +1,130 @@
+"""Parity tests: the batch engine, the bitmask candidate filter and the
+on-demand feedback kernel give the same results as the paths they replace.
+
+Usage: python -m pytest test_engines.py
+"""
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+import verbosity
+from batch_engine import play_batch
+from dordle_entropy import BoardState, game, update
+from feedback import (
+    FeedbackKernel, WordList, answer_words, board_guess_entropies, build_feedback_matrix, encode_dictionary,
+    encode_feedback, filter_candidates, guess_entropies, load_feedback_table, load_word_lists, num_answers,
+)
+from simulate import game_targets
+from solver import get_vector_feedback
+
+WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt")
+
+# small enough that every kernel lookup below is computed in several blocks
+KERNEL_BUDGET = 4096
+
+
+@pytest.fixture(scope="module")
+def word_list():
+    return load_word_lists(WORDS)
+
+
+# a small word list whose answers are a prefix of the guesses
+@pytest.fixture(scope="module")
+def small_list(word_list):
+    return WordList(word_list[:400], num_answers=150)
+
+
+# the set-based update of the original dordle_entropy script
+def original_update(guess, vector_feedback, guessed_words, candidate_list, correct_letters, possible_letters):
+    guessed_words.add(guess)
+    for i, result in enumerate(vector_feedback):
+        if result == 0:  # gray
+            for j in range(5):
+                possible_letters[j].discard(guess[i])
+        elif result == 1:  # yellow
+            possible_letters[i].discard(guess[i])
+            correct_letters.add(guess[i])
+        else:  # green
+            possible_letters[i] = set(guess[i])
+            correct_letters.add(guess[i])
+
+    candidate_list[:] = [
+        word for word in candidate_list
+        if all(letter in possible_letters[i] for i, letter in enumerate(word))
+        and correct_letters.issubset(set(word))
+        and word not in guessed_words
+    ]
+
+
+def test_play_batch_matches_game(word_list):
+    word_index, _ = load_feedback_table(word_list)
+    games = [game_targets(word_list, 0, game_num) for game_num in range(30)]
+    attempts = play_batch(word_list, [[word_index[word] for word in target_words] for target_words in games])
+    with verbosity.verbose(False):
+        expected = [game(target_words, word_list) for target_words in games]
+    assert attempts.tolist() == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bitmask_update_matches_original_filter(word_list, seed):
+    rng = random.Random(seed)
+    target = rng.choice(answer_words(word_list))
+    guesses = ["tares"] + rng.sample(list(word_list), 5)
+    if seed % 2:
+        # the target itself: only the guessed-word check removes it
+        guesses[-1] = target
+
+    board, guessed_words = BoardState(word_list), set()
+    candidate_list, correct_letters = list(answer_words(word_list)), set()
+    possible_letters = [set("abcdefghijklmnopqrstuvwxyz") for _ in range(5)]
+    original_guessed = set()
+    for guess in guesses:
+        vector = get_vector_feedback(guess, target)
+        update(guess, vector, guessed_words, board, word_list)
+        original_update(guess, vector, original_guessed, candidate_list, correct_letters, possible_letters)
+        assert [word_list[i] for i in np.flatnonzero(board.candidates)] == candidate_list
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kernel_indexing_matches_matrix(small_list, seed):
+    matrix = build_feedback_matrix(small_list)
+    kernel = FeedbackKernel(*encode_dictionary(small_list), num_answers(small_list), memory_budget=KERNEL_BUDGET)
+    assert kernel.shape == matrix.shape
+
+    rng = np.random.default_rng(seed)
+    guess_idx = rng.choice(len(small_list), 60, replace=False)
+    target_idx = rng.choice(num_answers(small_list), 40, replace=False)
+    pairs = rng.choice(num_answers(small_list), (60, 2))
+    assert np.array_equal(kernel[int(guess_idx[0])], matrix[int(guess_idx[0])])
+    assert np.array_equal(kernel[guess_idx], matrix[guess_idx])
+    assert np.array_equal(kernel[int(guess_idx[0]), target_idx], matrix[int(guess_idx[0]), target_idx])
+    assert np.array_equal(kernel[np.ix_(guess_idx, target_idx)], matrix[np.ix_(guess_idx, target_idx)])
+    assert np.array_equal(kernel[guess_idx[:, None], pairs], matrix[guess_idx[:, None], pairs])
+    assert np.array_equal(kernel.block(guess_idx, target_idx), matrix[np.ix_(guess_idx, target_idx)])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kernel_entropies_match_matrix(small_list, seed):
+    matrix = build_feedback_matrix(small_list)
+    kernel = FeedbackKernel(*encode_dictionary(small_list), num_answers(small_list), memory_budget=KERNEL_BUDGET)
+
+    rng = np.random.default_rng(seed)
+    guess_idx = np.arange(len(small_list))
+    # one board with few candidates and one with most of them, so both
+    # gather paths of guess_entropies are taken
+    left = np.sort(rng.choice(num_answers(small_list), 10, replace=False))
+    right = np.sort(rng.choice(num_answers(small_list), 120, replace=False))
+    for candidate_idx in (left, right):
+        assert np.array_equal(
+            guess_entropies(kernel, guess_idx, candidate_idx), guess_entropies(matrix, guess_idx, candidate_idx)
+        )
+    assert np.array_equal(
+        board_guess_entropies(kernel, guess_idx, [left, right]), board_guess_entropies(matrix, guess_idx, [left, right])
+    )
+
+    guess = int(rng.integers(len(small_list)))
+    code = encode_feedback(get_vector_feedback(small_list[guess], small_list[int(right[0])]))
+    assert np.array_equal(filter_candidates(kernel, right, guess, code), filter_candidates(matrix, right, guess, code))
@@ -0,0 +1,158 @@
+"""Regression tests: the vectorized scoring and pruned guess selection make
+the same choices as the original scoring loop and make_guess over the full
+calc_entropy ratings.
+
+Usage: python -m pytest test_selection.py
+"""
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+from balanced2_dordle import Balanced2Solver, calc_board_entropies, combine_ratings
+from csp_scoring import pruned_guess, rank_words, score_words, select_guess
+from dordle_csp_hybrid import calc_entropy, make_guess
+from feedback import answer_words, encode_feedback, filter_candidates, load_feedback_table, load_word_lists, num_answers
+from solver import get_vector_feedback
+
+WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt")
+
+WEIGHTS = [(1, 1), (1, 0), (0, 1), (2, 0.5)]
+
+
+@pytest.fixture(scope="module")
+def word_list():
+    return load_word_lists(WORDS)
+
+
+# the scoring loop of the original scripts, as {word: score}
+def original_scores(word_list, guesses, feedback_matrix):
+    word_scores = {}
+    for sample_word in word_list:
+        word_score = 0
+        for guess, feedback in zip(guesses, feedback_matrix):
+            if guess == sample_word:
+                word_score += -100
+            else:
+                for i, (guess_letter, guess_fb) in enumerate(zip(guess, feedback)):
+                    if guess_fb == 2:
+                        word_score += 10 if sample_word[i] == guess_letter else -100
+                    elif guess_fb == 1:
+                        word_score += 5 if guess_letter in sample_word and sample_word[i] != guess_letter else -100
+                    elif guess_fb == 0:
+                        if guess_letter in sample_word:
+                            word_score += -100
+        for uncommon in ["q", "j", "z", "x", "v", "k", "w"]:
+            if uncommon in sample_word:
+                word_score += -0.5
+        word_scores[sample_word] = word_score
+    return word_scores
+
+
+# a seeded game history: the "tares" opener and up to three more guesses
+# against two targets, with each board's feedback vectors
+def history(word_list, seed):
+    rng = random.Random(seed)
+    targets = rng.sample(answer_words(word_list), 2)
+    guesses = ["tares"] + rng.sample(list(word_list), rng.randrange(4))
+    feedback = [[get_vector_feedback(guess, target) for guess in guesses] for target in targets]
+    return guesses, feedback
+
+
+# the answers consistent with one board's feedback
+def consistent(word_list, guesses, feedback):
+    word_index, feedback_codes = load_feedback_table(word_list)
+    candidates = np.arange(num_answers(word_list))
+    for guess, vector in zip(guesses, feedback):
+        candidates = filter_candidates(feedback_codes, candidates, word_index[guess], encode_feedback(vector))
+    return candidates
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_score_words_matches_original_loop(word_list, seed):
+    guesses, feedback = history(word_list, seed)
+    expected = original_scores(word_list, guesses, feedback[0])
+    scores = score_words(word_list, guesses, feedback[0])
+    assert dict(zip(word_list, scores.tolist())) == expected
+    # ratings keep the original types: ints unless an uncommon letter penalty applied
+    assert [(word, type(score)) for word, score in rank_words(word_list, scores)] == [
+        (word, type(expected[word])) for word, _ in rank_words(word_list, scores)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("candidate_aware", [False, True])
+def test_select_guess_matches_make_guess(word_list, seed, candidate_aware):
+    guesses, feedback = history(word_list, seed)
+    scores = score_words(word_list, guesses, feedback[0])
+    candidates = consistent(word_list, guesses, feedback[0]) if candidate_aware else None
+    ratings = calc_entropy(guesses, rank_words(word_list, scores), word_list, candidates)
+    for csp_weight, entropy_weight in WEIGHTS:
+        expected = make_guess(ratings, csp_weight, entropy_weight, len(guesses))
+        assert select_guess(guesses, scores, word_list, candidates, csp_weight, entropy_weight) == expected
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("candidate_aware", [False, True])
+def test_select_joint_guess_matches_make_guess(word_list, seed, candidate_aware):
+    guesses, (feedback_left, feedback_right) = history(word_list, seed)
+    for csp_weight, entropy_weight in WEIGHTS:
+        solver = Balanced2Solver(
+            word_list, board_cache=False, candidate_aware=candidate_aware,
+            csp_weight=csp_weight, entropy_weight=entropy_weight,
+        )
+        for guess, left, right in zip(guesses, feedback_left, feedback_right):
+            solver.observe(guess, left, right)
+        if solver.left_word_solved or solver.right_word_solved:
+            continue
+        ratings = combine_ratings(*calc_board_entropies(
+            solver.guesses, solver.scorer_left.ranked(), solver.scorer_right.ranked(), word_list,
+            solver.candidates_left, solver.candidates_right,
+        ))
+        assert solver.select_joint_guess() == make_guess(ratings, csp_weight, entropy_weight, len(guesses))
+
+
+# with equal CSP scores on both boards every combined rating is decided by
+# the higher of the two boards' entropies (the max of the rating tuples)
+@pytest.mark.parametrize("seed", range(12))
+def test_select_joint_guess_breaks_csp_ties_by_entropy(word_list, seed):
+    guesses, (feedback_left, feedback_right) = history(word_list, seed)
+    solver = Balanced2Solver(word_list, board_cache=False, candidate_aware=True)
+    for guess, left, right in zip(guesses, feedback_left, feedback_right):
+        solver.observe(guess, left, right)
+    if solver.left_word_solved or solver.right_word_solved:
+        return
+    solver.scorer_right.scores = solver.scorer_left.scores.copy()
+    ratings = combine_ratings(*calc_board_entropies(
+        solver.guesses, solver.scorer_left.ranked(), solver.scorer_right.ranked(), word_list,
+        solver.candidates_left, solver.candidates_right,
+    ))
+    assert solver.select_joint_guess() == make_guess(ratings, 1, 1, len(guesses))
+
+
+# small synthetic ratings with many tied scores and entropies at the bound
+# (or, as computed entropies can be, an ulp above it), so the pruning slack
+# and the earliest-rating tie-break decide. Half are not in CSP order, like
+# the combined ratings of both boards.
+@pytest.mark.parametrize("seed", range(200))
+def test_pruned_guess_matches_make_guess(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 40))
+    bound = float(np.log2(8))
+    csps = np.sort(rng.choice([1.0, 2.0, 2.5, 3.0, 5.0], n))[::-1].copy()
+    if seed % 2:
+        rng.shuffle(csps)
+    scored = rng.random(n) < 0.8
+    entropy = rng.choice([0.0, 1.0, 1.5, bound, np.nextafter(bound, np.inf)], n)
+    ratings = {
+        position: (csps[position].item(), entropy[position].item()) if scored[position] else (0, 0)
+        for position in range(n)
+    }
+    for csp_weight, entropy_weight in WEIGHTS:
+        for block in (1, 2, 64):
+            position = pruned_guess(
+                csps, scored, lambda positions: entropy[positions].tolist(), bound, csp_weight, entropy_weight, block,
+            )
+            assert position == make_guess(ratings, csp_weight, entropy_weight, 0)
@@ -0,0 +1,24 @@
+"""Switch for the per-turn trace output printed by the game loops."""
+
+import contextlib
+import os
+
+# game loops check this before building any trace output, so batch runs with
+# VERBOSE = False pay nothing for it; set DORDLE_QUIET=1 to start quiet
+VERBOSE = os.environ.get("DORDLE_QUIET", "") in ("", "0")
+
+
+def set_verbose(verbose):
+    global VERBOSE
+    VERBOSE = verbose
+
+
+# temporarily silence (or enable) the trace output
+@contextlib.contextmanager
+def verbose(enabled):
+    previous = VERBOSE
+    set_verbose(enabled)
+    try:
+        yield
+    finally:
+        set_verbose(previous)